@@ -1,5 +1,30 @@
 from django.contrib import admin
-from .models import Campus, Department, Course, Student, GWARecord, HonorSocietyOfficer
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.utils.functional import cached_property
+from .models import Campus, Department, Course, Student, GWARecord, GWARecordHistory, HonorSocietyOfficer, HonorPolicy
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that trusts PostgreSQL's row estimate for large unfiltered changelists"""
+    # Below this many estimated rows an exact COUNT(*) is cheap enough
+    exact_count_threshold = 100000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > self.exact_count_threshold:
+                return row[0]
+        return super().count
+
 
 @admin.register(Campus)
 class CampusAdmin(admin.ModelAdmin):
@@ -11,6 +36,7 @@ class CampusAdmin(admin.ModelAdmin):
 class DepartmentAdmin(admin.ModelAdmin):
     list_display = ['name', 'code', 'campus']
     list_filter = ['campus']
+    list_select_related = ['campus']
     search_fields = ['name', 'code', 'campus__name']
     ordering = ['campus__name', 'name']
 
@@ -18,6 +44,7 @@ class DepartmentAdmin(admin.ModelAdmin):
 class CourseAdmin(admin.ModelAdmin):
     list_display = ['name', 'code', 'department', 'get_campus']
     list_filter = ['department__campus', 'department']
+    list_select_related = ['department__campus']
     search_fields = ['name', 'code', 'department__name']
     ordering = ['department__campus__name', 'department__name', 'name']
     
@@ -30,20 +57,57 @@ class CourseAdmin(admin.ModelAdmin):
 class StudentAdmin(admin.ModelAdmin):
     list_display = ['student_number', 'first_name', 'last_name', 'campus', 'department', 'year_level']
     list_filter = ['campus', 'department', 'year_level']
+    list_select_related = ['campus', 'department']
     search_fields = ['student_number', 'first_name', 'last_name']
     ordering = ['last_name', 'first_name']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 @admin.register(GWARecord)
 class GWARecordAdmin(admin.ModelAdmin):
     list_display = ['student', 'semester', 'academic_year', 'gwa', 'encoded_by', 'created_at']
-    list_filter = ['semester', 'academic_year', 'encoded_by']
+    list_filter = ['semester', 'academic_year']
+    list_select_related = ['student', 'encoded_by']
+    date_hierarchy = 'created_at'
+    autocomplete_fields = ['student', 'encoded_by']
     search_fields = ['student__student_number', 'student__first_name', 'student__last_name']
     ordering = ['-academic_year', '-semester', 'student__last_name']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['version', 'created_at', 'updated_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # Admin edits are logged to GWA record history like API edits
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            if change:
+                obj.version += 1
+            super().save_model(request, obj, form, change)
+            action = GWARecordHistory.UPDATE if change else GWARecordHistory.CREATE
+            GWARecordHistory.log([obj], action, request.user)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            GWARecordHistory.log([obj], GWARecordHistory.DELETE, request.user)
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            GWARecordHistory.log(queryset, GWARecordHistory.DELETE, request.user)
+            super().delete_queryset(request, queryset)
 
 @admin.register(HonorSocietyOfficer)
 class HonorSocietyOfficerAdmin(admin.ModelAdmin):
     list_display = ['user', 'position', 'campus', 'is_active']
     list_filter = ['campus', 'position', 'is_active']
+    list_select_related = ['user', 'campus']
+    autocomplete_fields = ['user']
     search_fields = ['user__username', 'user__first_name', 'user__last_name', 'position']
     ordering = ['campus__name', 'position']
+
+@admin.register(HonorPolicy)
+class HonorPolicyAdmin(admin.ModelAdmin):
+    list_display = ['campus', 'academic_year', 'max_gwa', 'min_year_level', 'min_semesters', 'failing_gwa', 'version']
+    list_filter = ['campus', 'academic_year']
+    list_select_related = ['campus']
+    readonly_fields = ['version']
+    ordering = ['campus__name', 'academic_year']
@@ -0,0 +1,72 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import DecimalField, ExpressionWrapper, F, IntegerField
+from django.db.models.functions import Cast, Round
+
+# GWA as an integer number of hundredths (1.75 -> 175), computed by the database
+GWA_HUNDREDTHS = Cast(
+    Round(ExpressionWrapper(F('gwa') * 100, output_field=DecimalField(max_digits=6, decimal_places=2))),
+    IntegerField()
+)
+
+# Philippine GWA scale, best to worst
+GWA_MIN = 100
+GWA_MAX = 500
+
+
+def parse_hundredths(value):
+    """Parse a GWA string such as '1.75' into hundredths, raising ValueError when invalid"""
+    try:
+        number = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f'Invalid GWA value: {value!r}')
+    # Arithmetic on a signaling NaN raises InvalidOperation rather than ValueError
+    if not number.is_finite():
+        raise ValueError(f'Invalid GWA value: {value!r}')
+    hundredths = number * 100
+    if hundredths != hundredths.to_integral_value() or not GWA_MIN <= hundredths <= GWA_MAX:
+        raise ValueError(f'Invalid GWA value: {value!r}')
+    return int(hundredths)
+
+
+def format_hundredths(hundredths):
+    return '%d.%02d' % divmod(hundredths, 100)
+
+
+def hundredths_to_decimal(hundredths):
+    """175 -> Decimal('1.75'), for filtering the DecimalField column exactly"""
+    return Decimal(hundredths).scaleb(-2)
+
+
+class GWADistribution:
+    """Sorted GWA values in hundredths, overall and per group, loaded with one query"""
+
+    def __init__(self, values_by_group):
+        self.groups = {group: array('H', sorted(values)) for group, values in values_by_group.items()}
+        self.overall = array('H', sorted(v for values in self.groups.values() for v in values))
+
+    @classmethod
+    def from_queryset(cls, queryset, group_field=None):
+        queryset = queryset.order_by().annotate(gwa_hundredths=GWA_HUNDREDTHS)
+        values_by_group = {}
+        if group_field is None:
+            values_by_group[None] = list(queryset.values_list('gwa_hundredths', flat=True))
+        else:
+            for group, hundredths in queryset.values_list(group_field, 'gwa_hundredths'):
+                values_by_group.setdefault(group, []).append(hundredths)
+        return cls(values_by_group)
+
+    def count_at_or_below(self, threshold, group=None):
+        values = self.overall if group is None else self.groups.get(group, ())
+        return bisect_right(values, threshold)
+
+    def histogram(self, width, start=GWA_MIN, stop=GWA_MAX):
+        """Counts of GWAs per `width`-hundredths bucket from `start` through `stop`"""
+        buckets = []
+        for low in range(start, stop + 1, width):
+            high = min(low + width - 1, stop)
+            count = bisect_right(self.overall, high) - bisect_left(self.overall, low)
+            buckets.append({'min': format_hundredths(low), 'max': format_hundredths(high), 'count': count})
+        return buckets
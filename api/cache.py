@@ -0,0 +1,31 @@
+import time
+
+from django.core.cache import cache
+
+
+def _version_key(namespace):
+    return f'version:{namespace}'
+
+
+def get_version(namespace):
+    """Current version of a cached namespace; bumping it orphans every key built from it"""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Time based so a restarted cache never reuses a version of older entries
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace):
+    """Invalidate every cache entry built with `versioned_key(namespace, ...)`"""
+    key = _version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def versioned_key(namespace, *parts):
+    return ':'.join([namespace, str(get_version(namespace)), *(str(part) for part in parts)])
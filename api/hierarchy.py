@@ -0,0 +1,35 @@
+import hashlib
+import json
+
+from .models import Campus, Course, Department
+
+
+def build_hierarchy(campus_id=None):
+    """Campus -> department -> course tree built from three flat queries"""
+    campuses = Campus.objects.order_by('name')
+    departments = Department.objects.order_by('name')
+    courses = Course.objects.order_by('name')
+    if campus_id is not None:
+        campuses = campuses.filter(id=campus_id)
+        departments = departments.filter(campus_id=campus_id)
+        courses = courses.filter(department__campus_id=campus_id)
+
+    courses_by_department = {}
+    for department_id, pk, name, code in courses.values_list('department_id', 'id', 'name', 'code'):
+        courses_by_department.setdefault(department_id, []).append({'id': pk, 'name': name, 'code': code})
+
+    departments_by_campus = {}
+    for campus, pk, name, code in departments.values_list('campus_id', 'id', 'name', 'code'):
+        departments_by_campus.setdefault(campus, []).append({
+            'id': pk, 'name': name, 'code': code, 'courses': courses_by_department.get(pk, []),
+        })
+
+    return [
+        {'id': pk, 'name': name, 'code': code, 'departments': departments_by_campus.get(pk, [])}
+        for pk, name, code in campuses.values_list('id', 'name', 'code')
+    ]
+
+
+def hierarchy_etag(tree):
+    digest = hashlib.sha1(json.dumps(tree, sort_keys=True).encode()).hexdigest()
+    return f'"{digest}"'
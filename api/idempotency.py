@@ -0,0 +1,62 @@
+import hashlib
+import json
+import re
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+# Printable ASCII without spaces, as clients typically send a UUID
+IDEMPOTENCY_KEY = re.compile(r'^[\x21-\x7e]{1,255}$')
+# How long a request holding a key may run before another request may take it over
+LOCK_TIMEOUT = 60
+
+
+def _digest(value):
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def idempotent(method):
+    """Replay the stored response of a ViewSet action retried with the same Idempotency-Key header.
+
+    Keys are per user. Only successful responses are stored, for
+    IDEMPOTENCY_KEY_TIMEOUT seconds; a retry while the first request is still
+    running gets a 409, and reusing a key for a different payload a 422.
+    """
+
+    @wraps(method)
+    def wrapped(self, request, *args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return method(self, request, *args, **kwargs)
+        if not IDEMPOTENCY_KEY.match(key):
+            return Response({'error': 'Idempotency-Key must be 1-255 printable ASCII characters.'}, status=400)
+
+        cache_key = f'idempotency:{request.user.pk}:{_digest(key)}'
+        fingerprint = _digest(json.dumps([request.method, request.path, request.data], sort_keys=True, default=str))
+        if not cache.add(cache_key, {'fingerprint': fingerprint, 'response': None}, LOCK_TIMEOUT):
+            stored = cache.get(cache_key)
+            if stored is None or stored['response'] is None:
+                return Response({'error': 'A request with this Idempotency-Key is still in progress.'}, status=409)
+            if stored['fingerprint'] != fingerprint:
+                return Response({'error': 'This Idempotency-Key was used for a different request.'}, status=422)
+            status, data = stored['response']
+            response = Response(data, status=status)
+            response['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = method(self, request, *args, **kwargs)
+        except BaseException:
+            cache.delete(cache_key)
+            raise
+        if 200 <= response.status_code < 300:
+            stored = {'fingerprint': fingerprint, 'response': (response.status_code, response.data)}
+            cache.set(cache_key, stored, settings.IDEMPOTENCY_KEY_TIMEOUT)
+        else:
+            # Failed requests may be retried with the same key
+            cache.delete(cache_key)
+        return response
+
+    return wrapped
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.models import AcademicYearArchive, ArchivedGWARecord, GWARecord
+
+COLUMNS = ['id', 'student_id', 'semester', 'academic_year', 'gwa', 'encoded_by_id', 'created_at', 'updated_at', 'version']
+
+
+def move_rows(source_model, target_model, academic_year):
+    """Move one academic year's rows between the hot and archive tables, returning the row count.
+
+    Runs as INSERT ... SELECT plus DELETE so rows never pass through Python and
+    keep their ids and timestamps. Only rows that were copied are deleted: a
+    record committed between the two statements (READ COMMITTED sees it in the
+    DELETE but not the INSERT) stays where it is rather than being lost. This
+    is a storage move, not an edit, so no model signals are sent.
+    """
+    quote = connection.ops.quote_name
+    source = quote(source_model._meta.db_table)
+    target = quote(target_model._meta.db_table)
+    columns = ', '.join(quote(column) for column in COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {target} ({columns}) SELECT {columns} FROM {source} WHERE academic_year = %s',
+            [academic_year]
+        )
+        cursor.execute(
+            f'DELETE FROM {source} WHERE academic_year = %s '
+            f'AND {quote("id")} IN (SELECT {quote("id")} FROM {target} WHERE academic_year = %s)',
+            [academic_year, academic_year]
+        )
+        return cursor.rowcount
+
+
+class Command(BaseCommand):
+    help = 'Move the GWA records of a closed academic year out of the hot table into the read-only archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('academic_year', help='Academic year to archive, e.g. 2022-2023')
+        parser.add_argument('--restore', action='store_true', help='Move an archived year back into the hot table')
+
+    def handle(self, *args, **options):
+        academic_year = options['academic_year']
+
+        with transaction.atomic():
+            archive = AcademicYearArchive.objects.select_for_update().filter(academic_year=academic_year).first()
+
+            if options['restore']:
+                if archive is None:
+                    raise CommandError(f'{academic_year} is not archived.')
+                total = move_rows(ArchivedGWARecord, GWARecord, academic_year)
+                archive.delete()
+                self.stdout.write(self.style.SUCCESS(f'Restored {total} GWA records for {academic_year}.'))
+                return
+
+            if archive is not None:
+                raise CommandError(f'{academic_year} is already archived.')
+            total = move_rows(GWARecord, ArchivedGWARecord, academic_year)
+            AcademicYearArchive.objects.create(academic_year=academic_year, record_count=total)
+            # Written while the rows were being copied; left in place rather than lost
+            left = GWARecord.objects.filter(academic_year=academic_year).count()
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} GWA records for {academic_year}.'))
+        if left:
+            self.stderr.write(self.style.WARNING(
+                f'{left} GWA records for {academic_year} were written during the move and stay in the hot table.'
+            ))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from api.cache import bump_version
+from api.models import Course, Student
+
+
+class Command(BaseCommand):
+    help = 'Assign a course to students without one where their department offers exactly one course'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without saving')
+
+    def handle(self, *args, **options):
+        single_course_departments = (
+            Course.objects.values('department_id').annotate(courses=Count('id')).filter(courses=1)
+            .values('department_id')
+        )
+        course_by_department = dict(
+            Course.objects.filter(department_id__in=single_course_departments).values_list('department_id', 'id')
+        )
+        unassigned = Student.objects.filter(course__isnull=True)
+
+        assigned = 0
+        with transaction.atomic():
+            for department_id, course_id in course_by_department.items():
+                students = unassigned.filter(department_id=department_id)
+                if options['dry_run']:
+                    assigned += students.count()
+                else:
+                    # update() skips auto_now, and the sync feed needs updated_at to move
+                    assigned += students.update(course_id=course_id, updated_at=timezone.now())
+
+        remaining = unassigned.count() - (assigned if options['dry_run'] else 0)
+        if assigned and not options['dry_run']:
+            bump_version('gwa')
+        verb = 'Would assign' if options['dry_run'] else 'Assigned'
+        self.stdout.write(self.style.SUCCESS(f'{verb} a course to {assigned} students.'))
+        if remaining:
+            self.stdout.write(
+                f'{remaining} students are in departments with several courses and need a course set by hand.'
+            )
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.analytics import GWA_HUNDREDTHS, format_hundredths
+from api.models import GWARecord
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare reading and formatting GWA records as Decimals against integer hundredths, '
+        'the way generate_honor_reports exports them'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=100_000, help='GWA records to read from the database')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per path; the fastest is reported')
+
+    def handle(self, *args, **options):
+        records = GWARecord.objects.order_by('id')[:options['limit']]
+        rows = records.count()
+        if not rows:
+            raise CommandError('No GWA records to read.')
+
+        def decimal_path():
+            return [f'{gwa:.2f}' for gwa in records.values_list('gwa', flat=True).iterator(chunk_size=2000)]
+
+        def hundredths_path():
+            values = records.annotate(gwa_hundredths=GWA_HUNDREDTHS).values_list('gwa_hundredths', flat=True)
+            return [format_hundredths(gwa) for gwa in values.iterator(chunk_size=2000)]
+
+        decimal_seconds, decimal_output = self.time(decimal_path, options['repeat'])
+        hundredths_seconds, hundredths_output = self.time(hundredths_path, options['repeat'])
+        assert decimal_output == hundredths_output
+
+        self.stdout.write(f'{rows} records')
+        for label, seconds in (('Decimal', decimal_seconds), ('Hundredths', hundredths_seconds)):
+            self.stdout.write(f'  {label:<11}{seconds:8.3f} s  {seconds / rows * 1e9:8.0f} ns/row')
+        self.stdout.write(self.style.SUCCESS(f'Speedup: {decimal_seconds / hundredths_seconds:.1f}x'))
+
+    def time(self, path, repeat):
+        best, result = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = path()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
@@ -0,0 +1,129 @@
+import csv
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from api.analytics import GWA_HUNDREDTHS, format_hundredths
+from api.models import AcademicYearArchive, ArchivedGWARecord, Department, GWARecord, HonorPolicy
+
+COLUMNS = ['rank', 'student_number', 'last_name', 'first_name', 'year_level', 'course', 'semester', 'gwa']
+
+
+def _init_worker():
+    import django
+    # Needed under the spawn start method; a no-op in forked workers
+    django.setup()
+
+
+def write_department_report(path, academic_year, campus_id, department_id):
+    """Write one department's honor list to `path`, returning the number of rows.
+
+    Rows are streamed from the database and written to a temporary file that
+    replaces `path` only once complete, so an existing report is never partial.
+    """
+    model = ArchivedGWARecord if AcademicYearArchive.is_archived(academic_year) else GWARecord
+    policy = HonorPolicy.resolve(campus_id, academic_year)
+    rows = (
+        model.objects.filter(academic_year=academic_year, student__department_id=department_id)
+        .filter(policy.compile(model))
+        # Integer hundredths skip building a Decimal per row; see `manage.py bench_gwa`
+        .annotate(gwa_hundredths=GWA_HUNDREDTHS)
+        .order_by('semester', 'gwa', 'student__last_name', 'student__first_name')
+        .values_list(
+            'semester', 'gwa_hundredths', 'student__student_number', 'student__last_name', 'student__first_name',
+            'student__year_level', 'student__course__code'
+        )
+    )
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    count = 0
+    try:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as output:
+            writer = csv.writer(output)
+            writer.writerow(COLUMNS)
+            current_semester, rank = None, 0
+            for semester, gwa, number, last_name, first_name, year_level, course in rows.iterator(chunk_size=2000):
+                rank = rank + 1 if semester == current_semester else 1
+                current_semester = semester
+                writer.writerow([rank, number, last_name, first_name, year_level, course or '', semester, format_hundredths(gwa)])
+                count += 1
+            output.flush()
+            os.fsync(output.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return count
+
+
+class Command(BaseCommand):
+    help = 'Write per-campus, per-department honor lists as CSV files, one department per worker process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('academic_year', help='Academic year to report, e.g. 2024-2025')
+        parser.add_argument('--output-dir', default='honor_reports', help='Reports go to <dir>/<year>/<campus>/<department>.csv')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes; 1 runs inline')
+        parser.add_argument('--campus', action='append', dest='campuses', help='Campus code to report; repeatable')
+        parser.add_argument('--force', action='store_true', help='Regenerate reports that already exist')
+
+    def handle(self, *args, **options):
+        academic_year = options['academic_year']
+        root = Path(options['output_dir']) / academic_year
+
+        departments = Department.objects.select_related('campus').order_by('campus__code', 'code')
+        if options['campuses']:
+            departments = departments.filter(campus__code__in=options['campuses'])
+
+        tasks, skipped = [], 0
+        for department in departments:
+            path = root / department.campus.code / f'{department.code}.csv'
+            # Reports are replaced atomically, so one that exists is complete: rerunning resumes
+            if path.exists() and not options['force']:
+                skipped += 1
+                continue
+            tasks.append((str(path), academic_year, department.campus_id, department.id))
+
+        if skipped:
+            self.stdout.write(f'Skipping {skipped} existing reports (use --force to regenerate).')
+        if not tasks:
+            self.stdout.write(self.style.SUCCESS('Nothing to generate.'))
+            return
+
+        failures = []
+        for done, (task, result) in enumerate(self.run_tasks(tasks, options['workers']), start=1):
+            label = os.path.relpath(task[0], root)
+            if isinstance(result, Exception):
+                failures.append(label)
+                self.stderr.write(f'[{done}/{len(tasks)}] {label}: failed: {result}')
+            else:
+                self.stdout.write(f'[{done}/{len(tasks)}] {label}: {result} records')
+
+        if failures:
+            raise CommandError(f'{len(failures)} reports failed; rerun the command to retry only those.')
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(tasks)} reports to {root}.'))
+
+    def run_tasks(self, tasks, workers):
+        """Yield (task, row count or exception) as each report finishes"""
+        if workers <= 1:
+            for task in tasks:
+                try:
+                    yield task, write_department_report(*task)
+                except Exception as e:
+                    yield task, e
+            return
+
+        # Forked workers must not share the parent's database connection
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            futures = {executor.submit(write_department_report, *task): task for task in tasks}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Boots the WSGI application the way a worker does and reports wall time and peak RSS
+BOOT_SCRIPT = """
+import json, resource, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+boot_ms = (time.perf_counter() - started) * 1000
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'boot_ms': boot_ms, 'rss_kb': rss // 1024 if sys.platform == 'darwin' else rss}))
+"""
+
+
+class Command(BaseCommand):
+    help = 'Report per-module import time and worker boot time/RSS for one or more settings modules'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--settings-module', action='append', dest='settings_modules',
+            help='Settings module to measure; repeat to compare (default: current and API-only settings)'
+        )
+        parser.add_argument('--top', type=int, default=20, help='Number of slowest imports to list')
+        parser.add_argument('--runs', type=int, default=3, help='Boots per settings module; the fastest is reported')
+
+    def handle(self, *args, **options):
+        modules = options['settings_modules'] or [
+            os.environ.get('DJANGO_SETTINGS_MODULE', 'honor_system.settings'),
+            'honor_system.settings_api',
+        ]
+
+        self.stdout.write(f'Slowest imports for {modules[0]} (cumulative ms):')
+        for cumulative_us, self_us, name in self.import_times(modules[0])[:options['top']]:
+            self.stdout.write(f'  {cumulative_us / 1000:9.1f}  {self_us / 1000:8.1f}  {name}')
+
+        self.stdout.write('')
+        self.stdout.write('Worker boot:')
+        for module in modules:
+            runs = [self.boot(module) for _ in range(max(options['runs'], 1))]
+            boot_ms = min(run['boot_ms'] for run in runs)
+            rss_kb = min(run['rss_kb'] for run in runs)
+            self.stdout.write(f'  {module}: {boot_ms:.0f} ms, {rss_kb / 1024:.1f} MiB max RSS')
+
+    def run_python(self, settings_module, *python_args):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module}
+        result = subprocess.run(
+            [sys.executable, *python_args, '-c', BOOT_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f'Booting {settings_module} failed:\n{result.stderr}')
+        return result
+
+    def boot(self, settings_module):
+        result = self.run_python(settings_module)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def import_times(self, settings_module):
+        """Return (cumulative_us, self_us, module) tuples, slowest first"""
+        result = self.run_python(settings_module, '-X', 'importtime')
+        rows = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            rows.append((int(cumulative_us), int(self_us), name.strip()))
+        return sorted(rows, reverse=True)
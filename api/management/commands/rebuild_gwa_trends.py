@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Campus
+from api.trends import refresh_trends
+
+
+class Command(BaseCommand):
+    help = 'Recompute the pre-aggregated GWA trend rows from GWA records, including archived years'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--academic-year', action='append', dest='academic_years', help='Academic year to rebuild; repeatable'
+        )
+        parser.add_argument('--campus', action='append', dest='campuses', help='Campus code to rebuild; repeatable')
+
+    def handle(self, *args, **options):
+        campuses = None
+        if options['campuses']:
+            campus_by_code = dict(Campus.objects.filter(code__in=options['campuses']).values_list('code', 'id'))
+            unknown = sorted(set(options['campuses']) - set(campus_by_code))
+            if unknown:
+                raise CommandError(f'Unknown campus codes: {", ".join(unknown)}.')
+            campuses = list(campus_by_code.values())
+
+        total = refresh_trends(campuses=campuses, academic_years=options['academic_years'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} GWA trend rows.'))
@@ -0,0 +1,103 @@
+import hmac
+import logging
+import random
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.utils.log import log_response
+
+from honor_system.log import request_id_var
+from .profiling import ProfileStore, RequestProfile
+from .query_budget import QueryRecorder
+
+logger = logging.getLogger(__name__)
+request_logger = logging.getLogger('api.requests')
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+REQUEST_ID_HEADER = 'HTTP_X_REQUEST_ID'
+REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+class RequestLogMiddleware:
+    """Log one structured record per request and tag every record logged during it with a request id.
+
+    The id is taken from an incoming `X-Request-ID` header when it looks sane,
+    generated otherwise, and returned in the response's `X-Request-ID`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_id = request.META.get(REQUEST_ID_HEADER, '')
+        if not REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        try:
+            with QueryRecorder() as recorder:
+                response = self.get_response(request)
+            latency_ms = (time.perf_counter() - started) * 1000
+            response['X-Request-ID'] = request_id
+
+            user = getattr(request, 'user', None)
+            match = request.resolver_match
+            request_logger.log(
+                logging.WARNING if response.status_code >= 500 else logging.INFO,
+                '%s %s %s', request.method, request.path, response.status_code,
+                extra={
+                    'method': request.method,
+                    'path': request.path,
+                    'route': match.route if match else None,
+                    'status': response.status_code,
+                    'user_id': user.pk if user is not None and user.is_authenticated else None,
+                    'latency_ms': round(latency_ms, 1),
+                    'query_count': recorder.count,
+                    'db_ms': round(recorder.db_ms, 1),
+                }
+            )
+            if response.status_code >= 400:
+                # Django logs error responses to django.request only after the
+                # middleware returns, when the request id is gone. Logged here,
+                # the response is marked as logged and Django skips it
+                log_response(
+                    '%s: %s', response.reason_phrase, request.path, response=response, request=request
+                )
+            return response
+        finally:
+            request_id_var.reset(token)
+
+
+class ProfilingMiddleware:
+    """Profile opted-in or sampled requests and store the result for the staff profile endpoints.
+
+    A request is profiled when it sends `X-Profile: <PROFILING_SECRET>` or
+    falls in the PROFILING_SAMPLE_RATE sample. Profiled responses carry the
+    stored profile's id in `X-Profile-Id`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def should_profile(self, request):
+        secret = settings.PROFILING_SECRET
+        header = request.META.get(PROFILE_HEADER)
+        # WSGI headers are latin-1 strings; compare bytes, as compare_digest
+        # raises TypeError on str with non-ASCII characters
+        if secret and header and hmac.compare_digest(header.encode('latin-1'), secret.encode()):
+            return True
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profile = RequestProfile(request)
+        response = profile.run(self.get_response)
+        try:
+            response['X-Profile-Id'] = ProfileStore().save(profile, response)
+        except OSError:
+            logger.exception('Could not store request profile')
+        return response
@@ -1,11 +1,17 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import connection, models
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
+from django.db.models.lookups import GreaterThanOrEqual
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 # Create your models here.
 
 class Campus(models.Model):
     name = models.CharField(max_length=100, unique=True)
     code = models.CharField(max_length=10, unique=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -14,6 +20,7 @@ class Department(models.Model):
     name = models.CharField(max_length=100, unique=True)
     code = models.CharField(max_length=10, unique=True)
     campus = models.ForeignKey(Campus, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -22,35 +29,104 @@ class Course(models.Model):
     name = models.CharField(max_length=100)
     code = models.CharField(max_length=10, unique=True)
     department = models.ForeignKey(Department, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.name} ({self.code})"
     
-class Student(models.Model):
+class LoadedValuesMixin:
+    """Remembers the `tracked_fields` values an instance was loaded with, as `loaded_values`"""
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_values()
+        return instance
+
+    def remember_loaded_values(self):
+        # Deferred fields are absent from __dict__ and remembered as None
+        self.loaded_values = {field: self.__dict__.get(field) for field in self.tracked_fields}
+
+class Student(LoadedValuesMixin, models.Model):
+    # Fields that decide which GWA trend rows a student's records count towards
+    tracked_fields = ('campus_id', 'department_id', 'year_level')
+
     student_number = models.CharField(max_length=20, unique=True)
     first_name = models.CharField(max_length=50)
     last_name = models.CharField(max_length=50)
     campus = models.ForeignKey(Campus, on_delete=models.CASCADE)
     year_level = models.IntegerField()
     department = models.ForeignKey(Department, on_delete=models.CASCADE)
+    # Degree program; null until assigned (see the backfill_student_courses command)
+    course = models.ForeignKey(Course, on_delete=models.SET_NULL, null=True, blank=True, related_name='students')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.first_name} {self.last_name} ({self.student_number})"
     
-class GWARecord(models.Model):
+class GWARecord(LoadedValuesMixin, models.Model):
+    tracked_fields = ('student_id', 'academic_year')
+
+    # Outcomes of upsert()
+    CREATED = 'created'
+    UPDATED = 'updated'
+    UNCHANGED = 'unchanged'
+
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     semester = models.CharField(max_length=20)
     academic_year = models.CharField(max_length=10)
     gwa = models.DecimalField(max_digits=4, decimal_places=2)
     encoded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='gwa_records')
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Incremented on every edit; clients send it back to detect concurrent edits
+    version = models.PositiveIntegerField(default=1)
 
     class Meta:
         unique_together = ('student', 'semester', 'academic_year')
 
     def __str__(self):
         return f"{self.student} - {self.semester} {self.academic_year}: {self.gwa:.2f}"
+
+    @classmethod
+    def upsert(cls, student_id, semester, academic_year, gwa, user):
+        """Create or update the record for (student, semester, academic_year) in one statement.
+
+        Uses INSERT ... ON CONFLICT DO UPDATE, which PostgreSQL and SQLite both
+        support, so concurrent submissions never hit the unique constraint.
+        Updates bump the version; resubmitting the stored GWA changes nothing.
+        Returns the (unsaved) record and CREATED, UPDATED or UNCHANGED. Like
+        bulk_create, this sends no model signals.
+        """
+        now = models.DateTimeField().get_db_prep_value(timezone.now(), connection)
+        table = connection.ops.quote_name(cls._meta.db_table)
+        sql = f"""
+            INSERT INTO {table} (student_id, semester, academic_year, gwa, encoded_by_id, created_at, updated_at, version)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, 1)
+            ON CONFLICT (student_id, semester, academic_year) DO UPDATE SET
+                gwa = EXCLUDED.gwa,
+                encoded_by_id = EXCLUDED.encoded_by_id,
+                updated_at = EXCLUDED.updated_at,
+                version = {table}.version + 1
+            WHERE {table}.gwa <> EXCLUDED.gwa
+            RETURNING id, version
+        """
+        gwa_value = connection.ops.adapt_decimalfield_value(gwa, max_digits=4, decimal_places=2)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [student_id, semester, academic_year, gwa_value, user.pk, now, now])
+            row = cursor.fetchone()
+
+        record = cls(student_id=student_id, semester=semester, academic_year=academic_year, gwa=gwa, encoded_by=user)
+        if row is None:
+            # The WHERE clause skipped an update that would not change anything
+            existing = cls.objects.values('id', 'version', 'encoded_by_id').get(
+                student_id=student_id, semester=semester, academic_year=academic_year
+            )
+            record.id, record.version, record.encoded_by_id = existing['id'], existing['version'], existing['encoded_by_id']
+            return record, cls.UNCHANGED
+        record.id, record.version = row
+        return record, cls.CREATED if record.version == 1 else cls.UPDATED
     
 class HonorSocietyOfficer(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -60,4 +136,231 @@ class HonorSocietyOfficer(models.Model):
     is_verified = models.BooleanField(default=False)  # Admin verification required
 
     def __str__(self):
-        return f"{self.user.username} - {self.position} ({self.campus.name})"
\ No newline at end of file
+        return f"{self.user.username} - {self.position} ({self.campus.name})"
+
+class AcademicYearArchive(models.Model):
+    """Closed academic year whose GWA records were moved to ArchivedGWARecord"""
+    academic_year = models.CharField(max_length=10, unique=True)
+    record_count = models.IntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.academic_year} ({self.record_count} records)"
+
+    @classmethod
+    def is_archived(cls, academic_year):
+        return cls.objects.filter(academic_year=academic_year).exists()
+
+
+class ArchivedGWARecord(models.Model):
+    """Read-only GWA record of an archived academic year, keeping its original id"""
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='archived_gwa_records')
+    semester = models.CharField(max_length=20)
+    academic_year = models.CharField(max_length=10)
+    gwa = models.DecimalField(max_digits=4, decimal_places=2)
+    encoded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_gwa_records')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        unique_together = ('student', 'semester', 'academic_year')
+
+    def __str__(self):
+        return f"{self.student} - {self.semester} {self.academic_year}: {self.gwa:.2f}"
+
+
+
+class HonorPolicy(models.Model):
+    """Honor eligibility rules for a campus and academic year.
+
+    A blank campus or academic year applies to all of them; the most specific
+    policy wins. Rules compile once into a single Q object, so eligibility is
+    always decided by one set-based query.
+    """
+    campus = models.ForeignKey(Campus, on_delete=models.CASCADE, null=True, blank=True)
+    academic_year = models.CharField(max_length=10, blank=True)
+    max_gwa = models.DecimalField(max_digits=4, decimal_places=2, default=Decimal('1.75'))
+    min_year_level = models.IntegerField(null=True, blank=True)
+    min_semesters = models.IntegerField(default=1, help_text='Semesters with a GWA record in the same academic year')
+    failing_gwa = models.DecimalField(
+        max_digits=4, decimal_places=2, null=True, blank=True,
+        help_text='Any semester GWA at or above this in the same academic year disqualifies'
+    )
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    _compiled = {}
+
+    class Meta:
+        unique_together = ('campus', 'academic_year')
+        verbose_name_plural = 'honor policies'
+
+    def __str__(self):
+        scope = self.campus.name if self.campus_id else 'All campuses'
+        return f"{scope} {self.academic_year or 'all years'}: GWA <= {self.max_gwa}"
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            self.version += 1
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def resolve(cls, campus_id=None, academic_year=None):
+        """Most specific policy for a campus/academic year, or the unsaved default policy"""
+        candidates = cls.objects.filter(
+            Q(campus_id=campus_id) | Q(campus__isnull=True),
+            Q(academic_year=academic_year or '') | Q(academic_year='')
+        )
+        return cls._most_specific(candidates)
+
+    @classmethod
+    def _most_specific(cls, candidates):
+        ranked = sorted(candidates, key=lambda p: (p.campus_id is None, p.academic_year == ''))
+        return ranked[0] if ranked else cls()
+
+    @classmethod
+    def eligible(cls, queryset, max_gwa=None, policies=None):
+        """Q selecting eligible rows of `queryset`, each judged by the policy of its own campus and academic year.
+
+        Reads the campus/academic year pairs in scope with one query and the
+        policies (unless given) with another. When every pair shares one rule
+        set that policy's Q is used as is; otherwise the policies' Qs are
+        ORed, each limited to the pairs it governs.
+        """
+        if policies is None:
+            policies = list(cls.objects.all())
+        years_by_campus_by_policy = {}
+        pairs = queryset.order_by().values_list('student__campus_id', 'academic_year').distinct()
+        for campus_id, academic_year in pairs:
+            policy = cls._most_specific(
+                p for p in policies
+                if p.campus_id in (campus_id, None) and p.academic_year in (academic_year, '')
+            )
+            rules = (policy.max_gwa, policy.min_year_level, policy.min_semesters, policy.failing_gwa)
+            policy, years_by_campus = years_by_campus_by_policy.setdefault(rules, (policy, {}))
+            years_by_campus.setdefault(campus_id, set()).add(academic_year)
+
+        if len(years_by_campus_by_policy) <= 1:
+            policy, years_by_campus = next(iter(years_by_campus_by_policy.values()), (cls(), {}))
+            return policy.compile(queryset.model, max_gwa=max_gwa)
+        eligible = Q(pk__in=[])
+        for policy, years_by_campus in years_by_campus_by_policy.values():
+            governed = Q(pk__in=[])
+            for campus_id, academic_years in years_by_campus.items():
+                governed |= Q(student__campus_id=campus_id, academic_year__in=sorted(academic_years))
+            eligible |= governed & policy.compile(queryset.model, max_gwa=max_gwa)
+        return eligible
+
+    def compile(self, model, max_gwa=None):
+        """Q selecting eligible rows of `model` (GWARecord or ArchivedGWARecord), cached per rule set"""
+        max_gwa = Decimal(str(max_gwa)) if max_gwa is not None else self.max_gwa
+        # Keyed on the rules themselves, so a saved edit (new version) compiles afresh
+        key = (model._meta.label, max_gwa, self.min_year_level, self.min_semesters, self.failing_gwa)
+        if key not in self._compiled:
+            self._compiled[key] = self._build(model, max_gwa)
+        return self._compiled[key]
+
+    def _build(self, model, max_gwa):
+        q = Q(gwa__lte=max_gwa)
+        if self.min_year_level:
+            q &= Q(student__year_level__gte=self.min_year_level)
+
+        same_year = model.objects.filter(student=OuterRef('student'), academic_year=OuterRef('academic_year'))
+        if self.min_semesters > 1:
+            semesters = same_year.order_by().values('student').annotate(count=Count('id')).values('count')
+            q &= Q(GreaterThanOrEqual(Subquery(semesters), self.min_semesters))
+        if self.failing_gwa is not None:
+            q &= ~Q(Exists(same_year.filter(gwa__gte=self.failing_gwa)))
+        return q
+
+
+class Tombstone(models.Model):
+    """Marker left by a deleted row so offline clients can sync deletions"""
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class GWARecordHistory(models.Model):
+    """Append-only log of GWA record values, one row per create, update or delete.
+
+    Rows are never updated, so relations don't cascade or enforce constraints and
+    history outlives the records, students and users it mentions.
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTION_CHOICES = [(CREATE, 'Create'), (UPDATE, 'Update'), (DELETE, 'Delete')]
+
+    record_id = models.BigIntegerField()
+    student = models.ForeignKey(
+        Student, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+'
+    )
+    semester = models.CharField(max_length=20)
+    academic_year = models.CharField(max_length=10)
+    gwa = models.DecimalField(max_digits=4, decimal_places=2)
+    version = models.PositiveIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changed_by = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, null=True, related_name='+'
+    )
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['record_id', 'changed_at']),
+            models.Index(fields=['student', 'academic_year']),
+            models.Index(fields=['changed_by', 'changed_at']),
+        ]
+        verbose_name_plural = 'GWA record history'
+
+    def __str__(self):
+        return f"{self.action} record {self.record_id} v{self.version}: {self.gwa}"
+
+    @classmethod
+    def entry(cls, record, action, user):
+        return cls(
+            record_id=record.pk,
+            student_id=record.student_id,
+            semester=record.semester,
+            academic_year=record.academic_year,
+            gwa=record.gwa,
+            version=record.version,
+            action=action,
+            changed_by=user,
+        )
+
+    @classmethod
+    def log(cls, records, action, user):
+        """Append one history row per record with a single INSERT"""
+        return cls.objects.bulk_create([cls.entry(record, action, user) for record in records])
+
+
+class GWATrend(models.Model):
+    """GWA totals of one department's records for an academic year and semester, kept for trend charts.
+
+    Derived from GWARecord and ArchivedGWARecord by api.trends, which
+    recomputes the affected rows after each write. GWAs are in hundredths,
+    so averages divide exactly.
+    """
+    campus = models.ForeignKey(Campus, on_delete=models.CASCADE, related_name='gwa_trends')
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name='gwa_trends')
+    academic_year = models.CharField(max_length=10)
+    semester = models.CharField(max_length=20)
+    record_count = models.IntegerField()
+    gwa_total = models.IntegerField()
+    best_gwa = models.IntegerField()
+    worst_gwa = models.IntegerField()
+    honor_count = models.IntegerField()
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('campus', 'department', 'academic_year', 'semester')
+        indexes = [models.Index(fields=['academic_year', 'semester'])]
+
+    def __str__(self):
+        return f"{self.department_id} {self.semester} {self.academic_year}: {self.record_count} records"
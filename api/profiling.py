@@ -0,0 +1,133 @@
+import cProfile
+import json
+import os
+import pstats
+import re
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+from .query_budget import QueryRecorder, fingerprint_sql
+
+PROFILE_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+class RequestProfile:
+    """cProfile run and SQL recording of a single request"""
+
+    def __init__(self, request):
+        self.request = request
+        self.profiler = cProfile.Profile()
+        self.recorder = QueryRecorder()
+
+    def run(self, get_response):
+        started = time.perf_counter()
+        with self.recorder:
+            self.profiler.enable()
+            try:
+                response = get_response(self.request)
+            finally:
+                self.profiler.disable()
+        self.duration_ms = (time.perf_counter() - started) * 1000
+        return response
+
+    def sql_fingerprints(self):
+        """Statement shapes with their count and total DB time, slowest first"""
+        by_fingerprint = {}
+        for sql, duration in self.recorder.queries:
+            entry = by_fingerprint.setdefault(fingerprint_sql(sql), {'count': 0, 'db_ms': 0.0})
+            entry['count'] += 1
+            entry['db_ms'] += duration
+        rows = [
+            {'sql': sql, 'count': entry['count'], 'db_ms': round(entry['db_ms'], 2)}
+            for sql, entry in by_fingerprint.items()
+        ]
+        return sorted(rows, key=lambda row: row['db_ms'], reverse=True)
+
+    def hot_functions(self, limit):
+        stats = pstats.Stats(self.profiler)
+        rows = []
+        for (filename, line, function), (calls, primitive_calls, own, cumulative, callers) in stats.stats.items():
+            rows.append({
+                'function': function,
+                'location': f'{filename}:{line}',
+                'calls': calls,
+                'own_ms': round(own * 1000, 2),
+                'cumulative_ms': round(cumulative * 1000, 2),
+            })
+        rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+        return rows[:limit]
+
+    def summary(self, response, profile_id):
+        return {
+            'id': profile_id,
+            'created_at': timezone.now().isoformat(),
+            'method': self.request.method,
+            'path': self.request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round(self.duration_ms, 1),
+            'query_count': self.recorder.count,
+            'db_ms': round(self.recorder.db_ms, 1),
+            'sql': self.sql_fingerprints(),
+            'functions': self.hot_functions(settings.PROFILING_TOP_FUNCTIONS),
+        }
+
+
+class ProfileStore:
+    """Request profiles kept on local disk as <id>.json summaries plus <id>.prof pstats dumps.
+
+    The .prof files load into snakeviz, flameprof or `python -m pstats` for
+    a flamegraph. Only the newest PROFILING_MAX_FILES profiles are kept.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or settings.PROFILING_DIR)
+
+    def save(self, profile, response):
+        profile_id = uuid.uuid4().hex
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile.profiler.dump_stats(self.directory / f'{profile_id}.prof')
+        summary = profile.summary(response, profile_id)
+        tmp_path = self.directory / f'{profile_id}.json.tmp'
+        tmp_path.write_text(json.dumps(summary))
+        os.replace(tmp_path, self.directory / f'{profile_id}.json')
+        self.prune()
+        return profile_id
+
+    def _summaries(self):
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob('*.json'), key=lambda path: path.stat().st_mtime, reverse=True)
+
+    def prune(self):
+        for path in self._summaries()[settings.PROFILING_MAX_FILES:]:
+            path.unlink(missing_ok=True)
+            path.with_suffix('.prof').unlink(missing_ok=True)
+
+    def list(self):
+        """Newest first, without the per-function and per-statement detail"""
+        profiles = []
+        for path in self._summaries():
+            try:
+                summary = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            profiles.append({key: value for key, value in summary.items() if key not in ('sql', 'functions')})
+        return profiles
+
+    def get(self, profile_id):
+        if not PROFILE_ID.match(profile_id):
+            return None
+        try:
+            return json.loads((self.directory / f'{profile_id}.json').read_text())
+        except (OSError, ValueError):
+            return None
+
+    def pstats_path(self, profile_id):
+        if not PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / f'{profile_id}.prof'
+        return path if path.is_file() else None
@@ -0,0 +1,74 @@
+"""Pytest plugin that runs every router endpoint under its query budget.
+
+Tests asking for the `router_endpoint` fixture are parametrized over each
+ViewSet registered on the API router, so a new endpoint is budget-checked
+without anyone writing a test for it. `campus_dataset` adds a fully
+populated campus (department, course, student, GWA record and officer) per
+call, letting tests compare query counts as the data grows.
+
+The plugin also ends each run with the suite's wall time, flagged when it
+goes over the `suite_time_budget` ini setting.
+"""
+import time
+from itertools import count
+
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addini('suite_time_budget', 'Seconds the whole suite should take; 0 disables the check', default='0')
+
+
+def pytest_sessionstart(session):
+    session.config.suite_started = time.perf_counter()
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if hasattr(config, 'workerinput'):
+        # pytest-xdist workers; the controller reports for the whole run
+        return
+    elapsed = time.perf_counter() - config.suite_started
+    workers = getattr(config.option, 'numprocesses', None)
+    where = f'{workers} workers' if workers else 'one process'
+    budget = float(config.getini('suite_time_budget'))
+    terminalreporter.write_sep('-', f'suite wall time: {elapsed:.1f}s on {where}')
+    if budget and elapsed > budget:
+        terminalreporter.write_line(f'Suite took longer than its {budget:g}s budget.', yellow=True, bold=True)
+
+
+def pytest_generate_tests(metafunc):
+    if 'router_endpoint' not in metafunc.fixturenames:
+        return
+    from api.urls import router
+
+    endpoints = [(prefix, viewset) for prefix, viewset, basename in router.registry]
+    metafunc.parametrize('router_endpoint', endpoints, ids=[prefix for prefix, viewset in endpoints])
+
+
+@pytest.fixture
+def campus_dataset(db):
+    from django.contrib.auth.models import User
+    from api.models import Campus, Course, Department, GWARecord, HonorSocietyOfficer, Student
+
+    sequence = count(1)
+
+    def add_campus():
+        n = next(sequence)
+        campus = Campus.objects.create(name=f'Budget Campus {n}', code=f'BC{n}')
+        department = Department.objects.create(name=f'Budget Department {n}', code=f'BD{n}', campus=campus)
+        course = Course.objects.create(name=f'Budget Course {n}', code=f'BCS{n}', department=department)
+        student = Student.objects.create(
+            student_number=f'BUDGET-{n:03d}', first_name='Budget', last_name=f'Student {n}',
+            campus=campus, department=department, year_level=2
+        )
+        user = User.objects.create_user(username=f'budget-officer-{n}', password='budgetpass123')
+        HonorSocietyOfficer.objects.create(user=user, position='Member', campus=campus, is_verified=True)
+        record = GWARecord.objects.create(
+            student=student, semester='1st Semester', academic_year='2024-2025', gwa='1.50', encoded_by=user
+        )
+        return {
+            'campuses': campus, 'departments': department, 'courses': course,
+            'students': student, 'gwa-records': record, 'officers': user.honorsocietyofficer,
+        }
+
+    return add_campus
@@ -0,0 +1,128 @@
+import logging
+import re
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\((?:\s*(?:\?|%s)\s*,)+\s*(?:\?|%s)\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised under QUERY_BUDGET_STRICT when a view runs more or slower queries than it declared"""
+
+
+def fingerprint_sql(sql):
+    """Reduce a statement to its shape: literals become ? and IN lists collapse to (...)"""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """Context manager recording the SQL and DB time of every query on the default connection"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - started) * 1000))
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def db_ms(self):
+        return sum(duration for sql, duration in self.queries)
+
+    def fingerprints(self, limit=5):
+        """Most repeated statement shapes, which is where an N+1 shows up"""
+        return Counter(fingerprint_sql(sql) for sql, duration in self.queries).most_common(limit)
+
+
+def enforce_budget(name, recorder, max_queries=None, max_db_ms=None):
+    """Raise or log when `recorder` went over the budget declared for `name`"""
+    over_count = max_queries is not None and recorder.count > max_queries
+    over_time = max_db_ms is not None and recorder.db_ms > max_db_ms
+    if not (over_count or over_time):
+        return
+
+    fingerprints = recorder.fingerprints()
+    if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+        lines = '\n'.join(f'  {count}x {sql}' for sql, count in fingerprints)
+        raise QueryBudgetExceeded(
+            f'{name} ran {recorder.count} queries in {recorder.db_ms:.1f} ms '
+            f'(budget: {max_queries} queries, {max_db_ms} ms)\n{lines}'
+        )
+    logger.warning(
+        'Query budget exceeded',
+        extra={
+            'view': name,
+            'query_count': recorder.count,
+            'db_ms': round(recorder.db_ms, 1),
+            'max_queries': max_queries,
+            'max_db_ms': max_db_ms,
+            'fingerprints': [{'sql': sql, 'count': count} for sql, count in fingerprints],
+        }
+    )
+
+
+def query_budget(max_queries=None, max_db_ms=None):
+    """Declare the query budget of a function view; apply it above @api_view"""
+
+    def decorator(view):
+        # @api_view returns a generic `view` function; name the decorated function instead
+        name = getattr(view, 'cls', view).__name__
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            with QueryRecorder() as recorder:
+                response = view(request, *args, **kwargs)
+            enforce_budget(name, recorder, max_queries, max_db_ms)
+            return response
+        return wrapped
+
+    return decorator
+
+
+class QueryBudgetMixin:
+    """Enforces `max_queries`/`max_db_ms` on every ViewSet action.
+
+    `query_budgets` maps action names to a max query count for actions that
+    legitimately need more (or should need fewer) than the ViewSet default.
+    """
+    max_queries = 10
+    max_db_ms = 500
+    query_budgets = {}
+
+    def get_query_budget(self):
+        action = getattr(self, 'action', None)
+        return self.query_budgets.get(action, self.max_queries), self.max_db_ms
+
+    def dispatch(self, request, *args, **kwargs):
+        with QueryRecorder() as recorder:
+            response = super().dispatch(request, *args, **kwargs)
+        max_queries, max_db_ms = self.get_query_budget()
+        enforce_budget(f"{type(self).__name__}.{getattr(self, 'action', None)}", recorder, max_queries, max_db_ms)
+        return response
@@ -0,0 +1,203 @@
+import csv
+import io
+import json
+
+from .models import Campus, Course, Department, Student
+
+ROSTER_FIELDS = ('student_number', 'first_name', 'last_name', 'campus_code', 'department_code', 'year_level')
+# Everything but student_number is overwritten when the student already exists;
+# course only when the row gives a course_code (optional column), or is cleared
+# when the student moves department without one, as the old course is elsewhere
+UPSERT_FIELDS = ['first_name', 'last_name', 'campus', 'department', 'year_level', 'updated_at']
+
+
+class RosterError(ValueError):
+    """The upload as a whole cannot be read"""
+
+
+def read_rows(upload):
+    """Yield (row number, dict) from a CSV or NDJSON upload, one line at a time"""
+    name = (upload.name or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')) or upload.content_type in ('application/x-ndjson', 'application/jsonl'):
+        parse = _ndjson_rows
+    elif name.endswith('.csv') or upload.content_type == 'text/csv':
+        parse = _csv_rows
+    else:
+        raise RosterError('Upload a .csv or .ndjson file.')
+
+    text = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    try:
+        yield from parse(text)
+    except UnicodeDecodeError:
+        raise RosterError('The file is not UTF-8 text; rows before the bad byte were imported.')
+
+
+def _ndjson_rows(text):
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def _csv_rows(text):
+    reader = csv.DictReader(text)
+    missing = set(ROSTER_FIELDS) - set(reader.fieldnames or ())
+    if missing:
+        raise RosterError(f'Missing columns: {", ".join(sorted(missing))}.')
+    # Row 1 is the header
+    yield from enumerate(reader, start=2)
+
+
+class RosterImport:
+    """Validate roster rows and upsert them as students in batches.
+
+    Campus and department codes are resolved from maps loaded once up front.
+    A student_number seen earlier in the same file is reported as an error
+    rather than silently overwriting the earlier row. With `campus_scope`
+    set, rows may only create or update students of that campus.
+    """
+
+    def __init__(self, campus_scope=None, batch_size=1000):
+        self.campus_scope = campus_scope
+        self.batch_size = batch_size
+        self.campus_by_code = dict(Campus.objects.values_list('code', 'id'))
+        self.department_by_code = {
+            code: (pk, campus_id) for code, pk, campus_id in Department.objects.values_list('code', 'id', 'campus_id')
+        }
+        self.course_by_code = {
+            code: (pk, department_id) for code, pk, department_id in Course.objects.values_list('code', 'id', 'department_id')
+        }
+        self.seen = {}
+        self.batch = []
+        self.created = 0
+        self.updated = 0
+        self.total = 0
+        self.errors = []
+        # Old and new departments of updated students, whose GWA trends may have moved
+        self.updated_departments = set()
+
+    def error(self, number, row, message):
+        student_number = row.get('student_number') if isinstance(row, dict) else None
+        self.errors.append({'row': number, 'student_number': student_number, 'error': message})
+
+    def build_student(self, row):
+        """Return an unsaved Student for a row, raising ValueError with the reason it is invalid"""
+        values = {field: str(row.get(field) or '').strip() for field in ROSTER_FIELDS}
+        missing = [field for field, value in values.items() if not value]
+        if missing:
+            raise ValueError(f'Missing {", ".join(missing)}.')
+
+        campus_id = self.campus_by_code.get(values['campus_code'])
+        if campus_id is None:
+            raise ValueError(f'Unknown campus code {values["campus_code"]!r}.')
+        department_id, department_campus_id = self.department_by_code.get(values['department_code'], (None, None))
+        if department_id is None:
+            raise ValueError(f'Unknown department code {values["department_code"]!r}.')
+        if department_campus_id != campus_id:
+            raise ValueError(f'Department {values["department_code"]} is not on campus {values["campus_code"]}.')
+        if self.campus_scope is not None and campus_id != self.campus_scope:
+            raise ValueError('You can only import students for your own campus.')
+
+        course_code = str(row.get('course_code') or '').strip()
+        course_id = None
+        if course_code:
+            course_id, course_department_id = self.course_by_code.get(course_code, (None, None))
+            if course_id is None:
+                raise ValueError(f'Unknown course code {course_code!r}.')
+            if course_department_id != department_id:
+                raise ValueError(f'Course {course_code} is not offered by department {values["department_code"]}.')
+
+        try:
+            year_level = int(values['year_level'])
+        except ValueError:
+            year_level = 0
+        if year_level < 1:
+            raise ValueError('year_level must be a positive whole number.')
+
+        student = Student(
+            student_number=values['student_number'], first_name=values['first_name'], last_name=values['last_name'],
+            campus_id=campus_id, department_id=department_id, course_id=course_id, year_level=year_level
+        )
+        for field in ('student_number', 'first_name', 'last_name'):
+            if len(getattr(student, field)) > Student._meta.get_field(field).max_length:
+                raise ValueError(f'{field} is too long.')
+        return student
+
+    def add(self, number, row):
+        self.total += 1
+        if row is None:
+            self.error(number, row, 'Not a valid JSON object.')
+            return
+        try:
+            student = self.build_student(row)
+        except ValueError as e:
+            self.error(number, row, str(e))
+            return
+        if student.student_number in self.seen:
+            self.error(number, row, f'Duplicate student_number, first seen on row {self.seen[student.student_number]}.')
+            return
+        self.seen[student.student_number] = number
+
+        self.batch.append((number, student))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        numbers = [student.student_number for number, student in self.batch]
+        existing = {
+            student_number: (campus_id, department_id)
+            for student_number, campus_id, department_id in Student.objects.filter(
+                student_number__in=numbers
+            ).values_list('student_number', 'campus_id', 'department_id')
+        }
+
+        students = []
+        for number, student in self.batch:
+            if (
+                self.campus_scope is not None
+                and student.student_number in existing
+                and existing[student.student_number][0] != self.campus_scope
+            ):
+                self.error(number, {'student_number': student.student_number}, 'Student belongs to another campus.')
+                continue
+            students.append(student)
+            if student.student_number in existing:
+                self.updated_departments.update((existing[student.student_number][1], student.department_id))
+
+        def sets_course(student):
+            moved = student.student_number in existing and existing[student.student_number][1] != student.department_id
+            return student.course_id is not None or moved
+
+        with_course = [student for student in students if sets_course(student)]
+        keep_course = [student for student in students if not sets_course(student)]
+        for group, update_fields in ((with_course, UPSERT_FIELDS + ['course']), (keep_course, UPSERT_FIELDS)):
+            if group:
+                Student.objects.bulk_create(
+                    group, update_conflicts=True, unique_fields=['student_number'], update_fields=update_fields
+                )
+        updated = sum(1 for student in students if student.student_number in existing)
+        self.updated += updated
+        self.created += len(students) - updated
+        self.batch = []
+
+    def run(self, rows):
+        for number, row in rows:
+            self.add(number, row)
+        self.flush()
+        self.errors.sort(key=lambda error: error['row'])
+        return self.summary()
+
+    def summary(self):
+        return {
+            'total': self.total,
+            'created': self.created,
+            'updated': self.updated,
+            'error_count': len(self.errors),
+            'errors': self.errors,
+        }
@@ -0,0 +1,47 @@
+from .models import HonorSocietyOfficer
+
+# JWT claim carrying the officer's campus so scoped requests skip the officer lookup
+CAMPUS_CLAIM = 'campus_id'
+
+# Scope value for authenticated users that are neither staff nor officers
+NO_CAMPUS = -1
+
+
+def get_campus_scope(request):
+    """Return the campus id a request is limited to, or None for unrestricted (staff) access.
+
+    The scope is read from the access token claim when present, falls back to the
+    officer record otherwise, and is cached on the request.
+    """
+    if hasattr(request, '_campus_scope'):
+        return request._campus_scope
+
+    user = request.user
+    if user.is_staff or user.is_superuser:
+        scope = None
+    else:
+        token = request.auth
+        claim = token.get(CAMPUS_CLAIM) if hasattr(token, 'get') else None
+        if claim is not None:
+            scope = claim
+        else:
+            scope = (
+                HonorSocietyOfficer.objects.filter(user_id=user.pk)
+                .values_list('campus_id', flat=True)
+                .first()
+            )
+            if scope is None:
+                scope = NO_CAMPUS
+
+    request._campus_scope = scope
+    return scope
+
+
+def scope_queryset(queryset, request, campus_field):
+    """Restrict a queryset to the requesting officer's campus through `campus_field`"""
+    scope = get_campus_scope(request)
+    if scope is None:
+        return queryset
+    if scope == NO_CAMPUS:
+        return queryset.none()
+    return queryset.filter(**{f'{campus_field}_id': scope})
@@ -1,6 +1,30 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Campus, Department, GWARecord, HonorSocietyOfficer, Course, Student
+from .analytics import GWA_MAX, GWA_MIN, format_hundredths, hundredths_to_decimal, parse_hundredths
+from .models import (
+    Campus, Department, GWARecord, HonorSocietyOfficer, Course, Student, AcademicYearArchive, GWARecordHistory
+)
+
+class GWAField(serializers.Field):
+    """GWA rendered as a two-decimal string ('1.75') and parsed into an exact, range-checked Decimal.
+
+    Skips DecimalField's per-value quantize/validation, which dominates
+    serializing large record lists. Values are GWA points, so an unsaved
+    record's int renders as a GWA (2 -> '2.00'); code reading integer
+    hundredths formats them with format_hundredths.
+    """
+    default_error_messages = {
+        'invalid': f'Enter a GWA from {format_hundredths(GWA_MIN)} to {format_hundredths(GWA_MAX)} with at most two decimals.'
+    }
+
+    def to_representation(self, value):
+        return f'{value:.2f}'
+
+    def to_internal_value(self, data):
+        try:
+            return hundredths_to_decimal(parse_hundredths(data))
+        except ValueError:
+            self.fail('invalid')
 
 class CampusSerializer(serializers.ModelSerializer):
     class Meta:
@@ -23,30 +47,78 @@ class CourseSerializer(serializers.ModelSerializer):
         model = Course
         fields = ['id', 'name', 'code', 'department', 'department_id']
 
+class CourseSummarySerializer(serializers.ModelSerializer):
+    """Course without its department, for nesting under a student that already has one"""
+
+    class Meta:
+        model = Course
+        fields = ['id', 'name', 'code']
+
 class StudentSerializer(serializers.ModelSerializer):
     campus = CampusSerializer(read_only=True)
     department = DepartmentSerializer(read_only=True)
+    course = CourseSummarySerializer(read_only=True)
     campus_id = serializers.IntegerField(write_only=True)
     department_id = serializers.IntegerField(write_only=True)
+    course_id = serializers.IntegerField(write_only=True, required=False, allow_null=True)
 
     class Meta:
         model = Student
-        fields = ['id', 'student_number', 'first_name', 'last_name', 'campus', 'year_level', 'department', 'campus_id', 'department_id']  
+        fields = ['id', 'student_number', 'first_name', 'last_name', 'campus', 'year_level', 'department', 'course', 'campus_id', 'department_id', 'course_id']  
+
+    def validate(self, attrs):
+        course_id = attrs['course_id'] if 'course_id' in attrs else getattr(self.instance, 'course_id', None)
+        department_id = attrs.get('department_id', getattr(self.instance, 'department_id', None))
+        if course_id is not None and not Course.objects.filter(id=course_id, department_id=department_id).exists():
+            raise serializers.ValidationError({'course_id': 'Course must belong to the student\'s department.'})
+        return attrs
+
+def validate_open_year(value):
+    if AcademicYearArchive.is_archived(value):
+        raise serializers.ValidationError(f'Academic year {value} is archived and read-only.')
+    return value
 
 class GWARecordSerializer(serializers.ModelSerializer):
     student = StudentSerializer(read_only=True)
+    gwa = GWAField()
     student_id = serializers.IntegerField(write_only=True)
     encoded_by = serializers.StringRelatedField(read_only=True)
 
     class Meta:
         model = GWARecord
-        fields = ['id', 'student', 'semester', 'academic_year', 'gwa', 'encoded_by', 'created_at', 'updated_at', 'student_id']
-        read_only_fields = ['created_at', 'updated_at', 'encoded_by']
+        fields = ['id', 'student', 'semester', 'academic_year', 'gwa', 'encoded_by', 'created_at', 'updated_at', 'version', 'student_id']
+        read_only_fields = ['created_at', 'updated_at', 'encoded_by', 'version']
+
+    def validate_academic_year(self, value):
+        return validate_open_year(value)
 
     def create(self, validated_data):
         validated_data['encoded_by'] = self.context['request'].user
         return super().create(validated_data)
 
+class GWARecordHistorySerializer(serializers.ModelSerializer):
+    changed_by = serializers.StringRelatedField()
+    gwa = GWAField()
+
+    class Meta:
+        model = GWARecordHistory
+        fields = ['id', 'record_id', 'action', 'semester', 'academic_year', 'gwa', 'version', 'changed_by', 'changed_at']
+
+class GWAEditSerializer(serializers.Serializer):
+    """One cell of a bulk GWA edit, made against the record version the client last saw"""
+    id = serializers.IntegerField()
+    gwa = GWAField()
+    version = serializers.IntegerField(min_value=1)
+
+class GWAUpsertSerializer(serializers.Serializer):
+    """GWA of a student for a semester, identified by the natural key rather than a record id"""
+    student_id = serializers.IntegerField()
+    semester = serializers.CharField(max_length=GWARecord._meta.get_field('semester').max_length)
+    academic_year = serializers.CharField(
+        max_length=GWARecord._meta.get_field('academic_year').max_length, validators=[validate_open_year]
+    )
+    gwa = GWAField()
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -0,0 +1,131 @@
+import threading
+
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .cache import bump_version
+from .models import (
+    Campus, Course, Department, GWARecord, GWARecordHistory, HonorPolicy, HonorSocietyOfficer, Student, Tombstone
+)
+from .trends import schedule_record_refresh, schedule_refresh
+
+
+@receiver([post_save, post_delete], sender=GWARecord)
+@receiver([post_save, post_delete], sender=Student)
+def invalidate_gwa_caches(sender, **kwargs):
+    bump_version('gwa')
+
+
+@receiver([post_save, post_delete], sender=Campus)
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=Course)
+def invalidate_hierarchy_cache(sender, **kwargs):
+    bump_version('hierarchy')
+
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=HonorSocietyOfficer)
+@receiver([post_save, post_delete], sender=Campus)
+def invalidate_officer_caches(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no cached response includes
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_version('officers')
+
+
+# Tombstones of the delete() running on this thread. Django sends pre_delete
+# for every row a delete cascades to before deleting any, so the rows still
+# to go are known up front and their tombstones are written with one INSERT
+# once the last is deleted, instead of one INSERT per row. GWA records removed
+# by a cascade get their history rows the same way
+_deletion = threading.local()
+
+
+def _start_deletion(origin):
+    _deletion.origin = origin
+    _deletion.pending = set()
+    _deletion.tombstones = []
+    _deletion.history = []
+
+
+def _is_cascade(origin):
+    # Deleting GWA records themselves is logged by the caller, who knows the user
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is not GWARecord
+
+
+@receiver(pre_delete, sender=Campus)
+@receiver(pre_delete, sender=Department)
+@receiver(pre_delete, sender=Course)
+@receiver(pre_delete, sender=Student)
+@receiver(pre_delete, sender=GWARecord)
+def expect_tombstone(sender, instance, origin=None, **kwargs):
+    if origin is None:
+        return
+    key = (sender._meta.model_name, instance.pk)
+    # A row seen again is a retry of a delete that failed part way
+    if getattr(_deletion, 'origin', None) is not origin or key in _deletion.pending:
+        _start_deletion(origin)
+    _deletion.pending.add(key)
+    if sender is GWARecord and _is_cascade(origin):
+        _deletion.history.append(GWARecordHistory.entry(instance, GWARecordHistory.DELETE, None))
+
+
+@receiver(post_delete, sender=Campus)
+@receiver(post_delete, sender=Department)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=GWARecord)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    key = (sender._meta.model_name, instance.pk)
+    tombstone = Tombstone(model=key[0], object_id=key[1])
+    if origin is None or getattr(_deletion, 'origin', None) is not origin or key not in _deletion.pending:
+        tombstone.save()
+        return
+    _deletion.pending.remove(key)
+    _deletion.tombstones.append(tombstone)
+    if not _deletion.pending:
+        Tombstone.objects.bulk_create(_deletion.tombstones)
+        GWARecordHistory.objects.bulk_create(_deletion.history)
+        _start_deletion(None)
+
+
+@receiver([post_save, post_delete], sender=GWARecord)
+def refresh_record_trends(sender, instance, **kwargs):
+    schedule_record_refresh(instance.student_id, instance.academic_year)
+    loaded = getattr(instance, 'loaded_values', None)
+    if loaded and (loaded['student_id'], loaded['academic_year']) != (instance.student_id, instance.academic_year):
+        # Moved to another student or year, which leaves the old rows stale too
+        schedule_record_refresh(loaded['student_id'], loaded['academic_year'])
+    instance.remember_loaded_values()
+
+
+@receiver(post_save, sender=Student)
+def refresh_student_trends(sender, instance, created, **kwargs):
+    # A new student has no records yet. Otherwise a move or a year level
+    # change can shift records (and honor eligibility) between trend rows;
+    # other edits, such as names, leave the trends alone
+    loaded = getattr(instance, 'loaded_values', None)
+    current = {field: getattr(instance, field) for field in Student.tracked_fields}
+    instance.remember_loaded_values()
+    if created or loaded == current:
+        return
+    departments = {instance.department_id}
+    if loaded:
+        departments.add(loaded['department_id'])
+    schedule_refresh(departments=departments - {None})
+
+
+@receiver(pre_delete, sender=Student)
+def refresh_deleted_student_trends(sender, instance, **kwargs):
+    schedule_refresh(departments=[instance.department_id])
+
+
+@receiver([post_save, post_delete], sender=HonorPolicy)
+def refresh_policy_trends(sender, instance, **kwargs):
+    schedule_refresh(
+        campuses=[instance.campus_id] if instance.campus_id else None,
+        academic_years=[instance.academic_year] if instance.academic_year else None,
+    )
@@ -0,0 +1,129 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Campus, Course, Department, GWARecord, Student, Tombstone
+
+
+class FeedStage:
+    """One model in the change feed, read in (timestamp, id) order"""
+
+    def __init__(self, name, model, fields, timestamp_field='updated_at', campus_lookup=None):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.timestamp_field = timestamp_field
+        self.campus_lookup = campus_lookup
+
+    def rows(self, since, until, after, campus_id, limit):
+        ts = self.timestamp_field
+        queryset = self.model.objects.filter(**{f'{ts}__lte': until})
+        if since is not None:
+            queryset = queryset.filter(**{f'{ts}__gt': since})
+        if after is not None:
+            after_ts, after_id = after
+            queryset = queryset.filter(Q(**{f'{ts}__gt': after_ts}) | Q(**{ts: after_ts, 'id__gt': after_id}))
+        if campus_id is not None and self.campus_lookup:
+            queryset = queryset.filter(**{self.campus_lookup: campus_id})
+        return list(queryset.order_by(ts, 'id').values('id', *self.fields)[:limit])
+
+
+STAGES = [
+    FeedStage('campuses', Campus, ['name', 'code', 'updated_at'], campus_lookup='id'),
+    FeedStage('departments', Department, ['name', 'code', 'campus_id', 'updated_at'], campus_lookup='campus_id'),
+    FeedStage(
+        'courses', Course, ['name', 'code', 'department_id', 'updated_at'],
+        campus_lookup='department__campus_id'
+    ),
+    FeedStage(
+        'students', Student,
+        [
+            'student_number', 'first_name', 'last_name', 'campus_id', 'department_id', 'course_id', 'year_level',
+            'updated_at'
+        ],
+        campus_lookup='campus_id'
+    ),
+    FeedStage(
+        'gwa_records', GWARecord,
+        ['student_id', 'semester', 'academic_year', 'gwa', 'encoded_by_id', 'version', 'updated_at'],
+        campus_lookup='student__campus_id'
+    ),
+    # Deleted ids are not campus scoped; they reveal nothing a client doesn't already hold
+    FeedStage('deleted', Tombstone, ['model', 'object_id', 'deleted_at'], timestamp_field='deleted_at'),
+]
+
+
+class SyncCursor:
+    """Position in the change feed, exchanged with clients as an opaque token.
+
+    `since`/`until` bound the pass being read; `stage` and `after` locate the
+    next row inside it. A cursor without a stage marks a finished pass whose
+    `until` becomes the next pass's `since`.
+    """
+
+    def __init__(self, since=None, until=None, stage=None, after=None):
+        self.since = since
+        self.until = until
+        self.stage = stage
+        self.after = after
+
+    @classmethod
+    def decode(cls, token):
+        """Parse a token, raising ValueError when it is malformed"""
+        if not token:
+            return cls()
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode()))
+            if not isinstance(data, dict):
+                raise ValueError('Token is not an object')
+            parse = lambda value: datetime.fromisoformat(value) if value else None
+            after = (parse(data['a'][0]), int(data['a'][1])) if data.get('a') else None
+            stage = data.get('st')
+            if stage is not None and (type(stage) is not int or stage not in range(len(STAGES))):
+                raise ValueError('Unknown stage')
+            return cls(parse(data.get('s')), parse(data['u']), stage, after)
+        except (KeyError, TypeError, ValueError, IndexError) as e:
+            raise ValueError('Invalid sync token.') from e
+
+    def encode(self):
+        data = {
+            's': self.since.isoformat() if self.since else None,
+            'u': self.until.isoformat(),
+            'st': self.stage,
+            'a': [self.after[0].isoformat(), self.after[1]] if self.after else None,
+        }
+        return base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode()).decode()
+
+
+def read_changes(cursor, campus_id, limit):
+    """Return (changes by stage name, next cursor, has_more) for up to `limit` rows"""
+    if cursor.stage is None:
+        # Start a new pass from where the previous one ended (or from scratch). Rows
+        # from the last few seconds wait for the next pass, so writes still committing
+        # when it starts are never skipped.
+        until = timezone.now() - timedelta(seconds=settings.SYNC_LAG_SECONDS)
+        cursor = SyncCursor(since=cursor.until, until=until, stage=0)
+
+    changes = {stage.name: [] for stage in STAGES}
+    stage_index, after, remaining = cursor.stage, cursor.after, limit
+    while stage_index < len(STAGES) and remaining > 0:
+        stage = STAGES[stage_index]
+        rows = stage.rows(cursor.since, cursor.until, after, campus_id, remaining)
+        changes[stage.name] = rows
+        remaining -= len(rows)
+        if remaining == 0:
+            last = rows[-1]
+            after = (last[stage.timestamp_field], last['id'])
+        else:
+            stage_index, after = stage_index + 1, None
+
+    for row in changes['gwa_records']:
+        row['gwa'] = str(row['gwa'])
+
+    if stage_index >= len(STAGES):
+        return changes, SyncCursor(until=cursor.until), False
+    return changes, SyncCursor(cursor.since, cursor.until, stage_index, after), True
@@ -0,0 +1,84 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def changelist_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+@pytest.mark.integration
+class TestAdminChangelists:
+    """Test that admin changelists run a fixed number of queries"""
+
+    @pytest.fixture
+    def staff_client(self, client, admin_user):
+        client.force_login(admin_user)
+        return client
+
+    def make_students(self, campus, department, start, count):
+        from api.models import Student
+        return Student.objects.bulk_create([
+            Student(
+                student_number=f'2024-{i:04d}', first_name='First', last_name=f'Last{i}',
+                campus=campus, year_level=1, department=department
+            )
+            for i in range(start, start + count)
+        ])
+
+    def test_student_changelist_query_count(self, staff_client, campus, department):
+        """Test that student rows don't trigger per-row campus/department queries"""
+        url = '/admin/api/student/'
+        self.make_students(campus, department, 0, 2)
+        few = changelist_queries(staff_client, url)
+
+        self.make_students(campus, department, 2, 20)
+        many = changelist_queries(staff_client, url)
+
+        assert many == few
+
+    def test_gwa_record_changelist_query_count(self, staff_client, campus, department, user):
+        """Test that GWA rows don't trigger per-row student/encoder queries"""
+        from api.models import GWARecord
+        url = '/admin/api/gwarecord/'
+
+        students = self.make_students(campus, department, 0, 22)
+        GWARecord.objects.bulk_create([
+            GWARecord(student=s, semester='1st Semester', academic_year='2024-2025', gwa='1.50', encoded_by=user)
+            for s in students[:2]
+        ])
+        few = changelist_queries(staff_client, url)
+
+        GWARecord.objects.bulk_create([
+            GWARecord(student=s, semester='1st Semester', academic_year='2024-2025', gwa='1.50', encoded_by=user)
+            for s in students[2:]
+        ])
+        many = changelist_queries(staff_client, url)
+
+        assert many == few
+
+    def test_course_and_officer_changelist_query_count(self, staff_client, course, honor_society_officer, campus):
+        """Test that course and officer rows resolve their relations in the main query"""
+        from django.contrib.auth.models import User
+        from api.models import Course, HonorSocietyOfficer
+        few_courses = changelist_queries(staff_client, '/admin/api/course/')
+        few_officers = changelist_queries(staff_client, '/admin/api/honorsocietyofficer/')
+
+        for i in range(10):
+            Course.objects.create(name=f'Course {i}', code=f'C{i}', department=course.department)
+            officer_user = User.objects.create_user(username=f'officer{i}', password='x')
+            HonorSocietyOfficer.objects.create(user=officer_user, position='Member', campus=campus)
+
+        assert changelist_queries(staff_client, '/admin/api/course/') == few_courses
+        assert changelist_queries(staff_client, '/admin/api/honorsocietyofficer/') == few_officers
+
+    def test_student_autocomplete_on_gwa_form(self, staff_client, student):
+        """Test that the GWA record form uses autocomplete for students and encoders"""
+        response = staff_client.get('/admin/api/gwarecord/add/')
+        content = response.content.decode()
+        assert 'admin-autocomplete' in content
+        # The student select is rendered empty instead of listing every student
+        assert student.student_number not in content
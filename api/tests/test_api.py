@@ -241,3 +241,963 @@ class TestGWARecordAPI:
         assert 'highest_gwa' in response.data
         assert 'lowest_gwa' in response.data
         assert 'honor_eligible' in response.data
+
+
+@pytest.mark.integration
+class TestCampusScoping:
+    """Test that officers only see data from their own campus"""
+
+    @pytest.fixture
+    def other_campus_student(self, db):
+        from api.models import Campus, Department, Student
+        other_campus = Campus.objects.create(name='Other Campus', code='OTH')
+        other_department = Department.objects.create(name='Other Department', code='OD', campus=other_campus)
+        return Student.objects.create(
+            student_number='2024-900',
+            first_name='Other',
+            last_name='Student',
+            campus=other_campus,
+            year_level=1,
+            department=other_department
+        )
+
+    def test_officer_sees_only_own_campus(self, authenticated_client, student, other_campus_student):
+        """Test that list endpoints are limited to the officer's campus"""
+        response = authenticated_client.get('/api/students/')
+        numbers = [s['student_number'] for s in response.data['results']]
+        assert numbers == [student.student_number]
+
+        response = authenticated_client.get('/api/departments/')
+        assert all(d['campus']['id'] == student.campus_id for d in response.data['results'])
+
+    def test_officer_cannot_retrieve_other_campus(self, authenticated_client, other_campus_student):
+        """Test that detail endpoints hide other campuses' records"""
+        response = authenticated_client.get(f'/api/students/{other_campus_student.id}/')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_staff_sees_all_campuses(self, api_client, admin_user, student, other_campus_student):
+        """Test that staff users are not campus scoped"""
+        api_client.force_authenticate(user=admin_user)
+        response = api_client.get('/api/students/')
+        assert response.data['count'] == 2
+
+    def test_login_token_carries_campus(self, api_client, honor_society_officer):
+        """Test that the access token includes the officer's campus claim"""
+        from rest_framework_simplejwt.tokens import AccessToken
+        response = api_client.post('/api/auth/login/', {'username': 'testuser', 'password': 'testpass123'}, format='json')
+        token = AccessToken(response.data['access'])
+        assert token['campus_id'] == honor_society_officer.campus_id
+
+    def test_non_officer_sees_nothing(self, api_client, user, student):
+        """Test that authenticated users without an officer record get empty results"""
+        api_client.force_authenticate(user=user)
+        response = api_client.get('/api/students/')
+        assert response.data['count'] == 0
+
+    def test_officer_cannot_write_other_campus(self, authenticated_client, student, other_campus_student):
+        """Test that officers can't create or move students or GWA records onto other campuses"""
+        from api.models import GWARecord
+        record = {
+            'student_id': other_campus_student.id, 'semester': '1st Semester', 'academic_year': '2024-2025', 'gwa': '1.50'
+        }
+        response = authenticated_client.post('/api/gwa-records/', record, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'student_id' in response.data
+
+        own = authenticated_client.post('/api/gwa-records/', dict(record, student_id=student.id), format='json')
+        assert own.status_code == status.HTTP_201_CREATED
+        response = authenticated_client.patch(
+            f'/api/gwa-records/{own.data["id"]}/', {'student_id': other_campus_student.id}, format='json'
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert GWARecord.objects.get().student_id == student.id
+
+        new_student = {
+            'student_number': '2024-901', 'first_name': 'New', 'last_name': 'Student', 'year_level': 1,
+            'campus_id': other_campus_student.campus_id, 'department_id': other_campus_student.department_id,
+        }
+        response = authenticated_client.post('/api/students/', new_student, format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        # Own campus, but another campus's department
+        payload = dict(new_student, campus_id=student.campus_id)
+        response = authenticated_client.post('/api/students/', payload, format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        response = authenticated_client.patch(
+            f'/api/students/{student.id}/', {'campus_id': other_campus_student.campus_id}, format='json'
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_officer_cannot_move_departments_or_courses(
+        self, authenticated_client, department, course, other_campus_student
+    ):
+        """Test that officers can't create or move departments and courses onto other campuses"""
+        other_campus_id = other_campus_student.campus_id
+        response = authenticated_client.post(
+            '/api/departments/', {'name': 'Other', 'code': 'OTH', 'campus_id': other_campus_id}, format='json'
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        response = authenticated_client.patch(
+            f'/api/departments/{department.id}/', {'campus_id': other_campus_id}, format='json'
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        other_department_id = other_campus_student.department_id
+        response = authenticated_client.post(
+            '/api/courses/', {'name': 'Other', 'code': 'OTH', 'department_id': other_department_id}, format='json'
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        response = authenticated_client.patch(
+            f'/api/courses/{course.id}/', {'department_id': other_department_id}, format='json'
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        response = authenticated_client.patch(f'/api/courses/{course.id}/', {'name': 'Renamed'}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_refresh_follows_campus_move(self, api_client, honor_society_officer, other_campus_student):
+        """Test that refreshed and rotated tokens carry the officer's current campus, and stop once deactivated"""
+        from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+        login = api_client.post('/api/auth/login/', {'username': 'testuser', 'password': 'testpass123'}, format='json')
+        honor_society_officer.campus = other_campus_student.campus
+        honor_society_officer.save()
+
+        response = api_client.post('/api/auth/refresh/', {'refresh': login.data['refresh']}, format='json')
+        assert AccessToken(response.data['access'])['campus_id'] == other_campus_student.campus_id
+        rotated = api_client.post('/api/token/refresh/', {'refresh': login.data['refresh']}, format='json')
+        assert AccessToken(rotated.data['access'])['campus_id'] == other_campus_student.campus_id
+        assert RefreshToken(rotated.data['refresh'])['campus_id'] == other_campus_student.campus_id
+
+        honor_society_officer.is_active = False
+        honor_society_officer.save()
+        response = api_client.post('/api/token/refresh/', {'refresh': rotated.data['refresh']}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.integration
+class TestHonorThresholdsAPI:
+    """Test the what-if honor cutoff analysis endpoint"""
+
+    @pytest.fixture
+    def records(self, campus, department, user):
+        from api.models import GWARecord, Student
+        gwas = ['1.00', '1.15', '1.50', '1.75', '1.76', '2.25', '3.00']
+        for i, gwa in enumerate(gwas):
+            student = Student.objects.create(
+                student_number=f'2024-{i:03d}', first_name='First', last_name=f'Last{i}',
+                campus=campus, year_level=1, department=department
+            )
+            GWARecord.objects.create(
+                student=student, semester='1st Semester', academic_year='2024-2025', gwa=gwa, encoded_by=user
+            )
+
+    def test_counts_at_each_threshold(self, authenticated_client, records):
+        """Test eligible counts for several cutoffs in one request"""
+        url = '/api/gwa-records/honor_thresholds/?thresholds=1.50,1.75,2.00'
+        response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['total'] == 7
+        assert response.data['eligible'] == {'1.50': 3, '1.75': 4, '2.00': 5}
+
+    def test_group_by_department(self, authenticated_client, records, department):
+        """Test per-department breakdown"""
+        url = '/api/gwa-records/honor_thresholds/?thresholds=1.75&group_by=department'
+        response = authenticated_client.get(url)
+
+        assert response.data['groups'] == [
+            {'id': department.id, 'name': department.name, 'total': 7, 'eligible': {'1.75': 4}}
+        ]
+
+    def test_histogram(self, authenticated_client, records):
+        """Test GWA histogram buckets"""
+        response = authenticated_client.get('/api/gwa-records/honor_thresholds/')
+        buckets = {b['min']: b['count'] for b in response.data['histogram']}
+
+        assert buckets['1.00'] == 2
+        assert buckets['1.50'] == 1
+        assert buckets['1.75'] == 2
+        assert sum(buckets.values()) == 7
+
+    def test_cache_invalidated_on_write(self, authenticated_client, records):
+        """Test that a cached distribution is dropped when a record changes"""
+        from api.models import GWARecord
+        url = '/api/gwa-records/honor_thresholds/?thresholds=1.75'
+        assert authenticated_client.get(url).data['eligible'] == {'1.75': 4}
+
+        record = GWARecord.objects.get(gwa='3.00')
+        record.gwa = '1.25'
+        record.save()
+
+        assert authenticated_client.get(url).data['eligible'] == {'1.75': 5}
+
+    @pytest.mark.parametrize('thresholds', ['abc', 'sNaN'])
+    def test_invalid_threshold(self, authenticated_client, thresholds):
+        """Test that malformed thresholds are rejected"""
+        response = authenticated_client.get(f'/api/gwa-records/honor_thresholds/?thresholds={thresholds}')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.integration
+class TestHonorPolicy:
+    """Test policy-driven honor eligibility"""
+
+    @pytest.fixture
+    def records(self, campus, department, user):
+        """Three students: one clean, one junior, one with a failing semester"""
+        from api.models import GWARecord, Student
+        rows = {
+            '2024-101': (3, ['1.50', '1.60']),
+            '2024-102': (1, ['1.25', '1.40']),
+            '2024-103': (4, ['1.50', '3.00']),
+        }
+        for number, (year_level, gwas) in rows.items():
+            student = Student.objects.create(
+                student_number=number, first_name='First', last_name=number,
+                campus=campus, year_level=year_level, department=department
+            )
+            for semester, gwa in zip(['1st Semester', '2nd Semester'], gwas):
+                GWARecord.objects.create(
+                    student=student, semester=semester, academic_year='2024-2025', gwa=gwa, encoded_by=user
+                )
+
+    def eligible_numbers(self, client, query=''):
+        response = client.get(f'/api/gwa-records/honor_eligible/?academic_year=2024-2025{query}')
+        assert response.status_code == status.HTTP_200_OK
+        return sorted({r['student']['student_number'] for r in response.data})
+
+    def test_default_policy(self, authenticated_client, records):
+        """Test that without a policy the 1.75 cutoff applies"""
+        assert self.eligible_numbers(authenticated_client) == ['2024-101', '2024-102', '2024-103']
+
+    def test_campus_policy_rules(self, authenticated_client, records, campus):
+        """Test year level and failing grade rules"""
+        from api.models import HonorPolicy
+        HonorPolicy.objects.create(campus=campus, min_year_level=2, min_semesters=2, failing_gwa='3.00')
+
+        assert self.eligible_numbers(authenticated_client) == ['2024-101']
+
+        response = authenticated_client.get('/api/gwa-records/statistics/?academic_year=2024-2025')
+        assert response.data['honor_eligible'] == 2
+
+    def test_most_specific_policy_wins(self, campus):
+        """Test policy resolution order"""
+        from api.models import HonorPolicy
+        HonorPolicy.objects.create(max_gwa='2.00')
+        campus_policy = HonorPolicy.objects.create(campus=campus, max_gwa='1.50')
+        year_policy = HonorPolicy.objects.create(campus=campus, academic_year='2024-2025', max_gwa='1.25')
+
+        assert HonorPolicy.resolve(campus.id, '2024-2025') == year_policy
+        assert HonorPolicy.resolve(campus.id, '2023-2024') == campus_policy
+        assert HonorPolicy.resolve(None, None).max_gwa == 2
+
+    def test_eligibility_is_one_query(self, authenticated_client, records, campus):
+        """Test that rule evaluation is a single set-based query over GWA records"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import HonorPolicy
+        HonorPolicy.objects.create(campus=campus, min_semesters=2, failing_gwa='3.00')
+
+        with CaptureQueriesContext(connection) as context:
+            response = authenticated_client.get('/api/gwa-records/statistics/?academic_year=2024-2025')
+
+        assert response.data['honor_eligible'] == 4
+        gwa_queries = [q for q in context.captured_queries if 'FROM "api_gwarecord"' in q['sql']]
+        # The campus/academic year pairs in scope, then the single aggregate
+        assert len(gwa_queries) == 2
+        assert 'COUNT(' not in gwa_queries[0]['sql']
+
+    def test_unscoped_staff_use_each_campus_policy(self, api_client, admin_user, records, campus, department, user):
+        """Test that staff without ?campus= get each record judged by its own campus policy, as trends are"""
+        from api.models import Campus, Department, GWARecord, HonorPolicy, Student
+        from api.trends import refresh_trends
+        other = Campus.objects.create(name='Other Campus', code='OTH')
+        student = Student.objects.create(
+            student_number='2024-201', first_name='First', last_name='Other', campus=other, year_level=1,
+            department=Department.objects.create(name='Other Dept', code='OTD', campus=other)
+        )
+        GWARecord.objects.create(
+            student=student, semester='1st Semester', academic_year='2024-2025', gwa='1.50', encoded_by=user
+        )
+        HonorPolicy.objects.create(campus=campus, min_year_level=2)
+        api_client.force_authenticate(user=admin_user)
+
+        assert self.eligible_numbers(api_client) == ['2024-101', '2024-103', '2024-201']
+        statistics = api_client.get('/api/gwa-records/statistics/?academic_year=2024-2025').data
+        assert statistics['honor_eligible'] == 4
+
+        refresh_trends()
+        trends = api_client.get('/api/gwa-records/trends/?from_year=2024-2025&to_year=2024-2025').data['results']
+        assert sum(row['honor_eligible'] for row in trends) == 4
+
+
+@pytest.mark.integration
+class TestGWARecordConcurrency:
+    """Test optimistic concurrency and bulk GWA edits"""
+
+    @pytest.fixture
+    def records(self, campus, department, user):
+        from api.models import GWARecord, Student
+        records = []
+        for i in range(3):
+            student = Student.objects.create(
+                student_number=f'2024-{i:03d}', first_name='First', last_name=f'Last{i}',
+                campus=campus, year_level=1, department=department
+            )
+            records.append(GWARecord.objects.create(
+                student=student, semester='1st Semester', academic_year='2024-2025', gwa='2.00', encoded_by=user
+            ))
+        return records
+
+    def test_patch_increments_version(self, authenticated_client, gwa_record):
+        """Test that each edit bumps the record version"""
+        url = f'/api/gwa-records/{gwa_record.id}/'
+        response = authenticated_client.patch(url, {'gwa': '1.25', 'version': 1}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['version'] == 2
+
+    def test_patch_with_stale_version_conflicts(self, authenticated_client, gwa_record):
+        """Test that an edit based on an old version is rejected"""
+        url = f'/api/gwa-records/{gwa_record.id}/'
+        authenticated_client.patch(url, {'gwa': '1.25', 'version': 1}, format='json')
+        response = authenticated_client.patch(url, {'gwa': '1.00', 'version': 1}, format='json')
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.data['version'] == 2
+        gwa_record.refresh_from_db()
+        assert str(gwa_record.gwa) == '1.25'
+
+    def test_bulk_edit(self, authenticated_client, records):
+        """Test that edits apply per row and conflicts are reported"""
+        from api.models import GWARecord
+        first, second, third = records
+        third.gwa = '3.00'
+        third.version = 2
+        third.save()
+
+        edits = [
+            {'id': first.id, 'gwa': '1.25', 'version': 1},
+            {'id': second.id, 'gwa': '1.50', 'version': 1},
+            {'id': third.id, 'gwa': '1.75', 'version': 1},
+            {'id': 99999, 'gwa': '1.75', 'version': 1},
+        ]
+        response = authenticated_client.patch('/api/gwa-records/bulk/', edits, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [r['status'] for r in response.data['results']] == ['updated', 'updated', 'conflict', 'not_found']
+        assert response.data['results'][2]['version'] == 2
+        values = dict(GWARecord.objects.values_list('id', 'gwa'))
+        assert str(values[first.id]) == '1.25'
+        assert str(values[third.id]) == '3.00'
+
+    def test_bulk_edit_query_count_is_constant(self, authenticated_client, records, django_assert_max_num_queries):
+        """Test that a grid save costs the same number of queries however many cells change"""
+        edits = [{'id': r.id, 'gwa': '1.50', 'version': 1} for r in records]
+        with django_assert_max_num_queries(6):
+            response = authenticated_client.patch('/api/gwa-records/bulk/', edits, format='json')
+        assert all(r['status'] == 'updated' for r in response.data['results'])
+
+    def test_bulk_edit_validates_payload(self, authenticated_client, records):
+        """Test that malformed edits are rejected"""
+        response = authenticated_client.patch('/api/gwa-records/bulk/', [{'id': records[0].id}], format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.integration
+class TestGWARecordHistory:
+    """Test the append-only GWA change log"""
+
+    def history_inserts(self, queries):
+        return [q for q in queries if q['sql'].startswith('INSERT INTO "api_gwarecordhistory"')]
+
+    def test_create_update_delete_are_logged(self, authenticated_client, student):
+        """Test that each change appends exactly one history row"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        data = {'student_id': student.id, 'semester': '1st Semester', 'academic_year': '2024-2025', 'gwa': '2.00'}
+        with CaptureQueriesContext(connection) as created:
+            record_id = authenticated_client.post('/api/gwa-records/', data, format='json').data['id']
+        url = f'/api/gwa-records/{record_id}/'
+        with CaptureQueriesContext(connection) as updated:
+            authenticated_client.patch(url, {'gwa': '1.50'}, format='json')
+        with CaptureQueriesContext(connection) as deleted:
+            authenticated_client.delete(url)
+
+        for context in (created, updated, deleted):
+            assert len(self.history_inserts(context.captured_queries)) == 1
+
+        response = authenticated_client.get(f'{url}history/')
+        assert response.status_code == status.HTTP_200_OK
+        assert [(e['action'], e['gwa'], e['version']) for e in response.data['results']] == [
+            ('delete', '1.50', 2), ('update', '1.50', 2), ('create', '2.00', 1)
+        ]
+        assert response.data['results'][0]['changed_by'] == 'testuser'
+
+    def test_bulk_edit_logged_with_one_insert(self, authenticated_client, gwa_record):
+        """Test that bulk edits append their history in a single statement"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import GWARecordHistory
+
+        with CaptureQueriesContext(connection) as context:
+            authenticated_client.patch(
+                '/api/gwa-records/bulk/', [{'id': gwa_record.id, 'gwa': '1.25', 'version': 1}], format='json'
+            )
+
+        assert len(self.history_inserts(context.captured_queries)) == 1
+        assert GWARecordHistory.objects.get(record_id=gwa_record.id).gwa == 1.25
+
+    def test_admin_edits_are_logged(self, client, admin_user, gwa_record):
+        """Test that changing and deleting a record in the admin appends history rows"""
+        from api.models import GWARecordHistory
+        client.force_login(admin_user)
+        url = f'/admin/api/gwarecord/{gwa_record.id}/'
+        form = {
+            'student': gwa_record.student_id, 'semester': gwa_record.semester,
+            'academic_year': gwa_record.academic_year, 'gwa': '1.25', 'encoded_by': gwa_record.encoded_by_id,
+        }
+        assert client.post(f'{url}change/', form).status_code == 302
+        assert client.post(f'{url}delete/', {'post': 'yes'}).status_code == 302
+
+        history = GWARecordHistory.objects.filter(record_id=gwa_record.id).order_by('id')
+        assert [(h.action, str(h.gwa), h.version, h.changed_by_id) for h in history] == [
+            ('update', '1.25', 2, admin_user.id), ('delete', '1.25', 2, admin_user.id)
+        ]
+
+    def test_cascaded_deletes_are_logged(self, gwa_record, student, user):
+        """Test that records removed with their student get history rows, written with one INSERT"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import GWARecord, GWARecordHistory
+        other = GWARecord.objects.create(
+            student=student, semester='2nd Semester', academic_year='2024-2025', gwa='2.00', encoded_by=user
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            student.delete()
+
+        assert len(self.history_inserts(context.captured_queries)) == 1
+        assert set(GWARecordHistory.objects.values_list('record_id', 'action', 'changed_by')) == {
+            (gwa_record.id, 'delete', None), (other.id, 'delete', None)
+        }
+
+    def test_history_is_campus_scoped(self, api_client, gwa_record, campus):
+        """Test that officers of other campuses can't read a record's history"""
+        from django.contrib.auth.models import User
+        from api.models import Campus, GWARecordHistory, HonorSocietyOfficer
+        GWARecordHistory.log([gwa_record], GWARecordHistory.CREATE, None)
+        other_user = User.objects.create_user(username='other', password='x')
+        HonorSocietyOfficer.objects.create(
+            user=other_user, position='President', campus=Campus.objects.create(name='Other', code='OTH')
+        )
+        api_client.force_authenticate(user=other_user)
+
+        response = api_client.get(f'/api/gwa-records/{gwa_record.id}/history/')
+        assert response.data['count'] == 0
+
+
+@pytest.mark.integration
+class TestStudentRosterImport:
+    """Test bulk roster imports resolved by campus and department code"""
+
+    header = 'student_number,first_name,last_name,campus_code,department_code,year_level\n'
+
+    def upload(self, client, name, content):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        return client.post(
+            '/api/students/import/', {'file': SimpleUploadedFile(name, content.encode())}, format='multipart'
+        )
+
+    def test_csv_creates_and_updates(self, authenticated_client, student, department):
+        """Test that new students are created and existing ones updated by student_number"""
+        content = self.header + (
+            '2024-001,John,Updated,TEST,CS,2\n'
+            '2024-002,Jane,Roe,TEST,CS,1\n'
+        )
+        response = self.upload(authenticated_client, 'roster.csv', content)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 1
+        assert response.data['updated'] == 1
+        assert response.data['errors'] == []
+        student.refresh_from_db()
+        assert (student.last_name, student.year_level) == ('Updated', 2)
+
+    def test_row_errors_are_reported(self, authenticated_client, department):
+        """Test that bad rows are reported by row number and the rest still import"""
+        from api.models import Campus, Department, Student
+        other = Campus.objects.create(name='Other Campus', code='OTH')
+        Department.objects.create(name='Other Department', code='OD', campus=other)
+        content = self.header + (
+            '2024-010,Ana,Cruz,TEST,CS,1\n'
+            '2024-011,Ben,Reyes,TEST,NOPE,1\n'
+            '2024-010,Ana,Again,TEST,CS,1\n'
+            '2024-012,Cy,Lim,TEST,CS,first\n'
+            '2024-013,Di,Tan,OTH,OD,1\n'
+        )
+        response = self.upload(authenticated_client, 'roster.csv', content)
+
+        assert response.data['created'] == 1
+        assert [(error['row'], error['student_number']) for error in response.data['errors']] == [
+            (3, '2024-011'), (4, '2024-010'), (5, '2024-012'), (6, '2024-013'),
+        ]
+        assert 'first seen on row 2' in response.data['errors'][1]['error']
+        assert list(Student.objects.values_list('student_number', flat=True)) == ['2024-010']
+
+    def test_ndjson(self, authenticated_client, department):
+        """Test NDJSON uploads, with unparseable lines reported as errors"""
+        import json
+        from api.models import Student
+        lines = [
+            json.dumps({
+                'student_number': f'2025-{n:04d}', 'first_name': 'Batch', 'last_name': str(n),
+                'campus_code': 'TEST', 'department_code': 'CS', 'year_level': 1,
+            })
+            for n in range(25)
+        ]
+        response = self.upload(authenticated_client, 'roster.ndjson', '\n'.join(lines) + '\nnot json\n')
+
+        assert response.data['created'] == 25
+        assert response.data['errors'] == [{'row': 26, 'student_number': None, 'error': 'Not a valid JSON object.'}]
+        assert Student.objects.count() == 25
+
+    def test_course_code(self, authenticated_client, student, course):
+        """Test that an optional course_code column assigns the course"""
+        content = self.header.rstrip('\n') + ',course_code\n2024-001,John,Doe,TEST,CS,1,BSIT\n'
+        response = self.upload(authenticated_client, 'roster.csv', content)
+
+        assert response.data['updated'] == 1
+        student.refresh_from_db()
+        assert student.course == course
+
+    def test_department_move_clears_course(self, authenticated_client, student, course, campus):
+        """Test that moving a student to another department without a course_code drops the old course"""
+        from api.models import Department, Student
+        Department.objects.create(name='Engineering', code='ENG', campus=campus)
+        Student.objects.filter(pk=student.pk).update(course=course)
+        content = self.header + '2024-001,John,Doe,TEST,ENG,1\n'
+        response = self.upload(authenticated_client, 'roster.csv', content)
+
+        assert response.data['updated'] == 1
+        student.refresh_from_db()
+        assert (student.department.code, student.course) == ('ENG', None)
+
+        Student.objects.filter(pk=student.pk).update(course=course)
+        self.upload(authenticated_client, 'roster.csv', content)
+        student.refresh_from_db()
+        assert student.course == course
+
+    def test_missing_columns(self, authenticated_client):
+        """Test that a CSV without the roster columns is rejected"""
+        response = self.upload(authenticated_client, 'roster.csv', 'student_number,name\n1,x\n')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'campus_code' in response.data['error']
+
+
+@pytest.mark.integration
+class TestHierarchy:
+    """Test the cached campus -> department -> course tree"""
+
+    def test_tree(self, authenticated_client, course):
+        """Test the nested tree is built with three queries"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.hierarchy import build_hierarchy
+
+        with CaptureQueriesContext(connection) as context:
+            tree = build_hierarchy()
+        assert len(context.captured_queries) == 3
+
+        response = authenticated_client.get('/api/hierarchy/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == tree
+        department = response.json()[0]['departments'][0]
+        assert department['code'] == 'CS'
+        assert department['courses'] == [{'id': course.id, 'name': course.name, 'code': 'BSIT'}]
+
+    def test_etag_and_invalidation(self, authenticated_client, course, department):
+        """Test conditional requests and that writes change the ETag"""
+        from api.models import Course
+        etag = authenticated_client.get('/api/hierarchy/')['ETag']
+
+        response = authenticated_client.get('/api/hierarchy/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        Course.objects.create(name='Bachelor of Science in Computer Science', code='BSCS', department=department)
+        response = authenticated_client.get('/api/hierarchy/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+        assert len(response.json()[0]['departments'][0]['courses']) == 2
+
+    def test_scoped_to_officer_campus(self, authenticated_client, campus, department):
+        """Test that officers only see their own campus"""
+        from api.models import Campus
+        Campus.objects.create(name='Other Campus', code='OTH')
+        response = authenticated_client.get('/api/hierarchy/')
+        assert [node['id'] for node in response.json()] == [campus.id]
+
+
+@pytest.mark.integration
+class TestCourseAnalytics:
+    """Test student courses and course-level GWA statistics"""
+
+    @pytest.fixture
+    def enrolled(self, student, course, gwa_record, department, user):
+        from api.models import GWARecord, Student
+        student.course = course
+        student.save()
+        other = Student.objects.create(
+            student_number='2024-002', first_name='Jane', last_name='Roe', campus=student.campus,
+            year_level=1, department=department
+        )
+        GWARecord.objects.create(
+            student=other, semester='1st Semester', academic_year='2024-2025', gwa=2.50, encoded_by=user
+        )
+        return student
+
+    def test_statistics_by_course(self, authenticated_client, enrolled, course):
+        """Test per-course breakdown, with course-less students grouped under None"""
+        response = authenticated_client.get('/api/gwa-records/statistics/', {'group_by': 'course'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['total_records'] == 2
+        groups = {group['code']: group for group in response.data['groups']}
+        assert groups['BSIT']['id'] == course.id
+        assert groups['BSIT']['total_records'] == 1
+        assert groups['BSIT']['honor_eligible'] == 1
+        assert groups[None]['honor_eligible'] == 0
+
+    def test_course_filter(self, authenticated_client, enrolled, course):
+        """Test that course filters the statistics and honor eligibility"""
+        stats = authenticated_client.get('/api/gwa-records/statistics/', {'course': course.id})
+        assert stats.data['total_records'] == 1
+
+        eligible = authenticated_client.get('/api/gwa-records/honor_eligible/', {'course': course.id})
+        assert [record['student']['course']['code'] for record in eligible.data] == ['BSIT']
+
+    def test_statistics_cached_until_gwa_write(self, authenticated_client, enrolled):
+        """Test that repeat statistics calls skip the aggregate until a GWA record changes"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import GWARecord
+        first = authenticated_client.get('/api/gwa-records/statistics/')
+        with CaptureQueriesContext(connection) as context:
+            assert authenticated_client.get('/api/gwa-records/statistics/').data == first.data
+        assert not any('AVG' in query['sql'] for query in context.captured_queries)
+
+        GWARecord.objects.filter(student=enrolled).get().delete()
+        assert authenticated_client.get('/api/gwa-records/statistics/').data['total_records'] == 1
+
+    def test_course_must_match_department(self, authenticated_client, student, campus):
+        """Test that a student's course must be offered by their department"""
+        from api.models import Course, Department
+        elsewhere = Department.objects.create(name='Engineering', code='ENG', campus=campus)
+        course = Course.objects.create(name='Civil Engineering', code='BSCE', department=elsewhere)
+
+        response = authenticated_client.patch(f'/api/students/{student.id}/', {'course_id': course.id}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'course_id' in response.data
+
+
+@pytest.mark.integration
+class TestGWAPrecision:
+    """Test exact GWA parsing, rendering and aggregate rounding"""
+
+    @pytest.fixture
+    def records(self, student, department, user):
+        from api.models import GWARecord, Student
+        other = Student.objects.create(
+            student_number='2024-002', first_name='Jane', last_name='Roe', campus=student.campus,
+            year_level=1, department=department
+        )
+        for owner, gwa in ((student, '1.25'), (other, '1.30')):
+            GWARecord.objects.create(
+                student=owner, semester='1st Semester', academic_year='2024-2025', gwa=gwa, encoded_by=user
+            )
+        GWARecord.objects.create(
+            student=student, semester='2nd Semester', academic_year='2024-2025', gwa='1.00', encoded_by=user
+        )
+
+    @pytest.mark.parametrize('param', ['min_gwa', 'max_gwa'])
+    @pytest.mark.parametrize('value', ['abc', '1.755', '0.50', 'NaN', 'sNaN'])
+    def test_invalid_gwa_param(self, authenticated_client, param, value):
+        """Test that a malformed or out-of-range GWA filter is a 400, not a 500 or an ignored filter"""
+        response = authenticated_client.get('/api/gwa-records/', {param: value})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert param in response.data
+
+    def test_honor_eligible_min_gwa_is_cutoff(self, authenticated_client, records):
+        """Test that honor_eligible uses min_gwa as the cutoff instead of a lower bound"""
+        response = authenticated_client.get('/api/gwa-records/honor_eligible/', {'min_gwa': '1.25'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(record['gwa'] for record in response.data) == ['1.00', '1.25']
+
+    def test_statistics_rounded(self, authenticated_client, records):
+        """Test that the average is rounded to two decimals and extremes are exact"""
+        response = authenticated_client.get('/api/gwa-records/statistics/')
+
+        # (1.25 + 1.30 + 1.00) / 3 = 1.18333...
+        assert response.data['average_gwa'] == 1.18
+        assert response.data['highest_gwa'] == 1.0
+        assert response.data['lowest_gwa'] == 1.3
+        group = authenticated_client.get('/api/gwa-records/statistics/', {'group_by': 'campus'}).data['groups'][0]
+        assert group['average_gwa'] == 1.18
+
+
+@pytest.mark.unit
+class TestGWAField:
+    """Test the GWA serializer field"""
+
+    def test_round_trip(self):
+        """Test that GWAs render with two decimals, ints included, and input parses exactly"""
+        from decimal import Decimal
+        from api.models import GWARecord
+        from api.serializers import GWAField
+        field = GWAField()
+
+        assert field.to_representation(Decimal('1.5')) == '1.50'
+        assert field.to_representation(GWARecord(gwa=2).gwa) == '2.00'
+        assert field.run_validation('1.75') == Decimal('1.75')
+        assert field.run_validation(2) == Decimal('2.00')
+
+    @pytest.mark.parametrize('value', ['1.755', '5.01', 'x', None, '', 'sNaN', 'NaN', 'Infinity'])
+    def test_invalid(self, value):
+        """Test that values off the GWA scale are rejected"""
+        from rest_framework.exceptions import ValidationError
+        from api.serializers import GWAField
+
+        with pytest.raises(ValidationError):
+            GWAField().run_validation(value)
+
+
+@pytest.mark.integration
+class TestGWARecordUpsert:
+    """Test the natural-key GWA upsert endpoint"""
+
+    url = '/api/gwa-records/upsert/'
+
+    def payload(self, student, gwa):
+        return {'student_id': student.id, 'semester': '1st Semester', 'academic_year': '2024-2025', 'gwa': gwa}
+
+    def test_create_update_unchanged(self, authenticated_client, student):
+        """Test that upserts create, then bump the version, and skip writes for the same GWA"""
+        from api.models import GWARecord, GWARecordHistory
+
+        created = authenticated_client.put(self.url, self.payload(student, '1.75'), format='json')
+        assert created.status_code == status.HTTP_201_CREATED
+        assert (created.data['result'], created.data['version'], created.data['gwa']) == ('created', 1, '1.75')
+
+        updated = authenticated_client.put(self.url, self.payload(student, '1.50'), format='json')
+        assert updated.status_code == status.HTTP_200_OK
+        assert (updated.data['id'], updated.data['result'], updated.data['version']) == (created.data['id'], 'updated', 2)
+
+        unchanged = authenticated_client.put(self.url, self.payload(student, '1.50'), format='json')
+        assert (unchanged.data['result'], unchanged.data['version']) == ('unchanged', 2)
+
+        record = GWARecord.objects.get()
+        assert (str(record.gwa), record.version) == ('1.50', 2)
+        assert list(GWARecordHistory.objects.order_by('id').values_list('action', 'version')) == [
+            ('create', 1), ('update', 2)
+        ]
+
+    def test_existing_record_is_one_write(self, authenticated_client, gwa_record, student):
+        """Test that updating an existing record needs no read-then-write and bumps the statistics cache"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        authenticated_client.get('/api/gwa-records/statistics/')
+        with CaptureQueriesContext(connection) as context:
+            response = authenticated_client.put(self.url, self.payload(student, '1.25'), format='json')
+
+        assert response.data['version'] == 2
+        sql = [query['sql'].strip() for query in context.captured_queries]
+        writes = [statement for statement in sql if statement.startswith(('INSERT', 'UPDATE'))]
+        assert len(writes) == 2  # The upsert and its history row
+        assert 'ON CONFLICT' in writes[0]
+        assert authenticated_client.get('/api/gwa-records/statistics/').data['average_gwa'] == 1.25
+
+    def test_rejects_archived_year_and_foreign_student(self, authenticated_client, student, department):
+        """Test that archived years are read-only and officers can't write other campuses' students"""
+        from api.models import AcademicYearArchive, Campus, Student
+        AcademicYearArchive.objects.create(academic_year='2024-2025', record_count=0)
+        response = authenticated_client.put(self.url, self.payload(student, '1.75'), format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'academic_year' in response.data
+
+        other = Student.objects.create(
+            student_number='2024-999', first_name='A', last_name='B', year_level=1, department=department,
+            campus=Campus.objects.create(name='Other', code='OTH')
+        )
+        payload = dict(self.payload(other, '1.75'), academic_year='2025-2026')
+        response = authenticated_client.put(self.url, payload, format='json')
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_idempotency_key_replays_response(self, authenticated_client, student):
+        """Test that a retried request with the same key replays the stored response without SQL"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        headers = {'Idempotency-Key': 'a3f1c2d4-0000-4000-8000-000000000001'}
+
+        first = authenticated_client.put(self.url, self.payload(student, '1.75'), format='json', headers=headers)
+        with CaptureQueriesContext(connection) as context:
+            retry = authenticated_client.put(self.url, self.payload(student, '1.75'), format='json', headers=headers)
+
+        assert retry.status_code == status.HTTP_201_CREATED
+        assert retry.data == first.data
+        assert retry['Idempotent-Replayed'] == 'true'
+        assert not [q for q in context.captured_queries if 'api_gwarecord' in q['sql']]
+
+        reused = authenticated_client.put(self.url, self.payload(student, '2.00'), format='json', headers=headers)
+        assert reused.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_failed_request_releases_key(self, authenticated_client, student):
+        """Test that only successful responses are stored, so a corrected retry goes through"""
+        headers = {'Idempotency-Key': 'retry-me'}
+        bad = authenticated_client.put(self.url, self.payload(student, '9.99'), format='json', headers=headers)
+        assert bad.status_code == status.HTTP_400_BAD_REQUEST
+
+        good = authenticated_client.put(self.url, self.payload(student, '1.75'), format='json', headers=headers)
+        assert good.status_code == status.HTTP_201_CREATED
+
+
+@pytest.mark.integration
+class TestGWATrends:
+    """Test the pre-aggregated GWA trend table and endpoint"""
+
+    url = '/api/gwa-records/trends/'
+
+    def save(self, client, student, gwa, semester='1st Semester', academic_year='2024-2025'):
+        data = {'student_id': student.id, 'semester': semester, 'academic_year': academic_year, 'gwa': gwa}
+        return client.put('/api/gwa-records/upsert/', data, format='json')
+
+    @pytest.fixture
+    def refreshes(self, monkeypatch):
+        """Record the scope of every trend refresh run"""
+        from api import trends
+        calls = []
+        refresh = trends.refresh_trends
+        monkeypatch.setattr(trends, 'refresh_trends', lambda *scope: (calls.append(scope), refresh(*scope))[1])
+        return calls
+
+    def test_maintained_on_writes(self, authenticated_client, student, django_capture_on_commit_callbacks):
+        """Test that creates, edits and deletes through the API all update the trend rows"""
+        with django_capture_on_commit_callbacks(execute=True):
+            record_id = self.save(authenticated_client, student, '1.50').data['id']
+            self.save(authenticated_client, student, '2.00', academic_year='2023-2024')
+            authenticated_client.patch(f'/api/gwa-records/{record_id}/', {'gwa': '1.25'}, format='json')
+
+        results = authenticated_client.get(self.url).data['results']
+        assert [(p['academic_year'], p['total_records'], p['average_gwa'], p['honor_eligible']) for p in results] == [
+            ('2023-2024', 1, 2.0, 0), ('2024-2025', 1, 1.25, 1)
+        ]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.delete(f'/api/gwa-records/{record_id}/')
+        assert [p['academic_year'] for p in authenticated_client.get(self.url).data['results']] == ['2023-2024']
+
+    def test_bulk_edit_and_student_move(
+        self, authenticated_client, gwa_record, student, campus, django_capture_on_commit_callbacks
+    ):
+        """Test that bulk edits and department changes refresh the affected rows"""
+        from api.models import Department, GWATrend
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.patch(
+                '/api/gwa-records/bulk/', [{'id': gwa_record.id, 'gwa': '2.50', 'version': 1}], format='json'
+            )
+        assert GWATrend.objects.get().best_gwa == 250
+
+        other = Department.objects.create(name='Engineering', code='ENG', campus=campus)
+        with django_capture_on_commit_callbacks(execute=True):
+            student.department = other
+            student.save()
+        assert list(GWATrend.objects.values_list('department__code', flat=True)) == ['ENG']
+
+    def test_one_refresh_per_transaction(
+        self, student, user, refreshes, django_capture_on_commit_callbacks, django_assert_max_num_queries
+    ):
+        """Test that many record writes run one refresh, and edits that move nothing run none"""
+        from api.models import GWARecord, GWATrend
+        with django_capture_on_commit_callbacks(execute=True):
+            for year in range(2015, 2025):
+                GWARecord.objects.create(
+                    student=student, semester='1st Semester', academic_year=f'{year}-{year + 1}', gwa='1.50',
+                    encoded_by=user
+                )
+        assert len(refreshes) == 1
+        assert GWATrend.objects.count() == 10
+
+        refreshes.clear()
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            student.first_name = 'Renamed'
+            student.save()
+        assert callbacks == [] and refreshes == []
+
+        with django_assert_max_num_queries(30):
+            with django_capture_on_commit_callbacks(execute=True):
+                student.delete()
+        assert len(refreshes) == 1
+        assert GWATrend.objects.count() == 0
+
+    def test_rolled_back_writes_refresh_with_next_commit(self, student, user, django_capture_on_commit_callbacks):
+        """Test that scopes queued by a rolled back savepoint don't leave the next refresh short"""
+        from django.db import transaction
+        from api.models import GWARecord, GWATrend
+        with django_capture_on_commit_callbacks(execute=True):
+            with pytest.raises(RuntimeError), transaction.atomic():
+                GWARecord.objects.create(
+                    student=student, semester='1st Semester', academic_year='2023-2024', gwa='1.50', encoded_by=user
+                )
+                raise RuntimeError
+            GWARecord.objects.create(
+                student=student, semester='1st Semester', academic_year='2024-2025', gwa='1.75', encoded_by=user
+            )
+        assert list(GWATrend.objects.values_list('academic_year', flat=True)) == ['2024-2025']
+
+    def test_policy_change_recounts_honors(
+        self, authenticated_client, gwa_record, campus, django_capture_on_commit_callbacks
+    ):
+        """Test that a new honor policy updates honor counts of its campus"""
+        from api.models import HonorPolicy
+        from api.trends import refresh_trends
+        refresh_trends()
+        assert authenticated_client.get(self.url).data['results'][0]['honor_eligible'] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            HonorPolicy.objects.create(campus=campus, max_gwa='1.25')
+        assert authenticated_client.get(self.url).data['results'][0]['honor_eligible'] == 0
+
+    def test_group_by_and_scope(self, authenticated_client, gwa_record, user):
+        """Test per-department series, year filters and that officers only see their campus"""
+        from api.models import Campus, Department, GWARecord, Student
+        from api.trends import refresh_trends
+        elsewhere = Campus.objects.create(name='Other', code='OTH')
+        outsider = Student.objects.create(
+            student_number='2024-999', first_name='A', last_name='B', year_level=1, campus=elsewhere,
+            department=Department.objects.create(name='Other Dept', code='OD', campus=elsewhere)
+        )
+        GWARecord.objects.create(
+            student=outsider, semester='1st Semester', academic_year='2024-2025', gwa='1.00', encoded_by=user
+        )
+        refresh_trends()
+
+        response = authenticated_client.get(self.url, {'group_by': 'department', 'from_year': '2024-2025'})
+        assert response.status_code == status.HTTP_200_OK
+        assert [(p['code'], p['total_records']) for p in response.data['results']] == [('CS', 1)]
+        assert authenticated_client.get(self.url, {'to_year': '2023-2024'}).data['results'] == []
+        assert authenticated_client.get(self.url, {'group_by': 'course'}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_reads_only_trend_rows(self, authenticated_client, gwa_record):
+        """Test that the endpoint answers from the trend table without touching GWA records"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.trends import refresh_trends
+        refresh_trends()
+        with CaptureQueriesContext(connection) as context:
+            authenticated_client.get(self.url)
+        sql = [query['sql'] for query in context.captured_queries]
+        assert len([statement for statement in sql if 'api_gwatrend' in statement]) == 1
+        assert not [statement for statement in sql if 'api_gwarecord' in statement]
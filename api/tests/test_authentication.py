@@ -225,3 +225,204 @@ class TestAuthentication:
         
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert 'Invalid campus ID' in response.data['error']
+
+
+@pytest.mark.integration
+class TestTokenBlacklist:
+    """Test blacklist checks and pruning of refresh tokens"""
+
+    def login(self, api_client):
+        response = api_client.post('/api/auth/login/', {'username': 'testuser', 'password': 'testpass123'}, format='json')
+        return response.data['refresh'], response.data['access']
+
+    def test_logout_blacklists_refresh_token(self, api_client, honor_society_officer):
+        """Test that a logged out refresh token can no longer be used"""
+        refresh, access = self.login(api_client)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        response = api_client.post('/api/auth/logout/', {'refresh': refresh}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+        response = api_client.post('/api/auth/refresh/', {'refresh': refresh}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = api_client.post('/api/token/refresh/', {'refresh': refresh}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_rotated_token_rejected(self, api_client, honor_society_officer):
+        """Test that a refresh token rotated away cannot be replayed"""
+        refresh, _ = self.login(api_client)
+        response = api_client.post('/api/token/refresh/', {'refresh': refresh}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+        response = api_client.post('/api/token/refresh/', {'refresh': refresh}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_cache_sees_blacklist_from_other_process(self, api_client, honor_society_officer):
+        """Test that blacklist rows written elsewhere are picked up on sync"""
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from api.tokens import blacklist_cache
+        refresh, _ = self.login(api_client)
+        blacklist_cache.warm()
+
+        # Blacklist through the stock token class, bypassing the cache
+        RefreshToken(refresh).blacklist()
+
+        response = api_client.post('/api/auth/refresh/', {'refresh': refresh}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_cache_sees_late_committed_lower_id(self, user):
+        """Test that a blacklist row committing after a higher id is still picked up"""
+        from datetime import timedelta
+        from django.utils import timezone
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+        from api.tokens import blacklist_cache
+
+        expires_at = timezone.now() + timedelta(days=1)
+        early, late = (
+            OutstandingToken.objects.create(user=user, jti=jti, token='x', expires_at=expires_at)
+            for jti in ('early', 'late')
+        )
+        blacklist_cache.warm()
+        BlacklistedToken.objects.create(id=1000, token=late)
+        assert 'late' in blacklist_cache
+
+        # Id 500 was assigned first but its transaction committed last
+        BlacklistedToken.objects.create(id=500, token=early)
+        assert 'early' in blacklist_cache
+
+    def test_sync_reads_only_new_rows_and_gaps(self, user):
+        """Test that contiguous inserts leave nothing to re-read, so a sync is a range scan past the last id"""
+        from datetime import timedelta
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.utils import timezone
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+        from api.tokens import blacklist_cache
+
+        expires_at = timezone.now() + timedelta(days=1)
+        blacklist_cache.warm()
+        for i in range(20):
+            token = OutstandingToken.objects.create(user=user, jti=f'rotated-{i}', token='x', expires_at=expires_at)
+            BlacklistedToken.objects.create(token=token)
+            assert f'rotated-{i}' in blacklist_cache
+
+        assert blacklist_cache._gaps == {}
+        with CaptureQueriesContext(connection) as context:
+            assert 'fresh' not in blacklist_cache
+        assert len(context.captured_queries) == 1
+        assert ' IN (' not in context.captured_queries[0]['sql']
+
+    def test_sync_discards_expired(self, db):
+        """Test that syncing in the serving process forgets expired JTIs"""
+        from datetime import timedelta
+        from django.utils import timezone
+        from api.tokens import blacklist_cache
+
+        blacklist_cache.warm()
+        blacklist_cache.add('stale', timezone.now() - timedelta(seconds=1))
+        blacklist_cache._swept_at -= blacklist_cache.EXPIRY_SWEEP_INTERVAL
+
+        assert 'stale' not in blacklist_cache
+        assert len(blacklist_cache) == 0
+
+    def test_prune_tokens_command(self, honor_society_officer, user):
+        """Test that expired tokens are pruned in batches"""
+        from datetime import timedelta
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+        now = timezone.now()
+        for i in range(5):
+            token = OutstandingToken.objects.create(
+                user=user, jti=f'expired-{i}', token='x', expires_at=now - timedelta(days=1)
+            )
+            BlacklistedToken.objects.create(token=token)
+        OutstandingToken.objects.create(user=user, jti='live', token='x', expires_at=now + timedelta(days=1))
+
+        out = StringIO()
+        call_command('prune_tokens', batch_size=2, stdout=out)
+
+        assert 'Pruned 5' in out.getvalue()
+        assert list(OutstandingToken.objects.values_list('jti', flat=True)) == ['live']
+        assert BlacklistedToken.objects.count() == 0
+
+
+@pytest.mark.integration
+class TestLoginConcurrency:
+    """Test password hashing setup and bounded login concurrency"""
+
+    def test_fast_hasher_under_tests(self, settings):
+        """Test that tests use the cheap hasher profile"""
+        assert settings.PASSWORD_HASHERS[0].endswith('MD5PasswordHasher')
+
+    def test_login_bound_leaves_a_thread_free(self, settings):
+        """Test that the login bound is below the gunicorn thread count"""
+        assert settings.LOGIN_CONCURRENCY == max(1, settings.GUNICORN_THREADS - 1)
+
+    def test_login_rejected_when_slots_busy(self, api_client, honor_society_officer, monkeypatch):
+        """Test that logins beyond the concurrency bound are told to retry without waiting"""
+        import threading
+        import time
+        from api import views
+
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        monkeypatch.setattr(views, '_login_slots', slots)
+
+        started = time.monotonic()
+        response = api_client.post('/api/auth/login/', {'username': 'testuser', 'password': 'testpass123'}, format='json')
+
+        assert time.monotonic() - started < 1
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response['Retry-After'] == '1'
+
+
+@pytest.mark.integration
+class TestOfficerCaches:
+    """Test the cached profile and officer directory"""
+
+    def test_profile_served_from_cache(self, authenticated_client, django_assert_num_queries):
+        """Test that repeat profile calls run no queries"""
+        authenticated_client.get('/api/auth/profile/')
+        with django_assert_num_queries(0):
+            response = authenticated_client.get('/api/auth/profile/')
+        assert response.data['member']['position'] == 'President'
+
+    def test_profile_invalidated_by_writes(self, authenticated_client, user, honor_society_officer, campus):
+        """Test that officer, user and campus saves refresh the profile, but logins don't"""
+        from django.contrib.auth.models import update_last_login
+        from api.cache import get_version
+        authenticated_client.get('/api/auth/profile/')
+
+        version = get_version('officers')
+        update_last_login(None, user)
+        assert get_version('officers') == version
+
+        honor_society_officer.position = 'Secretary'
+        honor_society_officer.save()
+        user.email = 'new@example.com'
+        user.save()
+        campus.name = 'Renamed Campus'
+        campus.save()
+
+        response = authenticated_client.get('/api/auth/profile/')
+        assert response.data['member']['position'] == 'Secretary'
+        assert response.data['user']['email'] == 'new@example.com'
+        assert response.data['member']['campus']['name'] == 'Renamed Campus'
+
+    def test_directory_cached_per_campus(self, authenticated_client, honor_society_officer, admin_user):
+        """Test that the officer list is cached until an officer changes, separately per campus"""
+        from api.models import Campus, HonorSocietyOfficer
+        other = HonorSocietyOfficer.objects.create(
+            user=User.objects.create_user(username='other', password='x'),
+            position='Treasurer', campus=Campus.objects.create(name='Other', code='OTH')
+        )
+        assert authenticated_client.get('/api/officers/').data['count'] == 1
+
+        authenticated_client.force_authenticate(user=admin_user)
+        assert authenticated_client.get('/api/officers/').data['count'] == 2
+
+        other.delete()
+        assert authenticated_client.get('/api/officers/').data['count'] == 1
@@ -0,0 +1,213 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+
+
+@pytest.mark.integration
+class TestProfileStartupCommand:
+    """Test the startup profiling command"""
+
+    def test_reports_imports_and_boot(self, monkeypatch):
+        """Test that both settings profiles boot and are reported"""
+        monkeypatch.setenv('USE_SQLITE', 'true')
+        out = StringIO()
+        call_command('profile_startup', top=3, runs=1, stdout=out)
+
+        output = out.getvalue()
+        assert 'django' in output
+        assert 'honor_system.settings:' in output
+        assert 'honor_system.settings_api:' in output
+        assert 'MiB max RSS' in output
+
+
+@pytest.mark.integration
+class TestBenchGWACommand:
+    """Test the GWA formatting benchmark"""
+
+    def test_compares_report_paths(self, gwa_record):
+        """Test that both read paths format stored records alike and are reported"""
+        out = StringIO()
+        call_command('bench_gwa', limit=10, repeat=1, stdout=out)
+
+        output = out.getvalue()
+        assert '1 records' in output
+        assert 'Speedup' in output
+
+
+@pytest.mark.integration
+class TestWarmup:
+    """Test cache warm-up run in the gunicorn master"""
+
+    def test_warm_caches_loads_blacklist(self, db):
+        """Test that warm-up fills the token blacklist cache"""
+        from api.tokens import blacklist_cache
+        from api.warmup import warm_caches
+
+        warm_caches()
+
+        assert blacklist_cache.is_warm
+
+
+@pytest.mark.integration
+class TestArchiveAcademicYear:
+    """Test archiving closed academic years"""
+
+    def test_archive_moves_records_and_keeps_them_readable(self, authenticated_client, gwa_record):
+        """Test that archived records leave the hot table but stay readable"""
+        from api.models import ArchivedGWARecord, GWARecord
+        out = StringIO()
+        call_command('archive_academic_year', '2024-2025', stdout=out)
+
+        assert 'Archived 1' in out.getvalue()
+        assert not GWARecord.objects.exists()
+        archived = ArchivedGWARecord.objects.get()
+        assert archived.id == gwa_record.id
+        assert archived.created_at == gwa_record.created_at
+
+        response = authenticated_client.get('/api/gwa-records/?academic_year=2024-2025')
+        assert response.data['count'] == 1
+        assert response.data['results'][0]['gwa'] == '1.50'
+
+        response = authenticated_client.get(f'/api/gwa-records/{gwa_record.id}/')
+        assert response.status_code == 200
+
+        response = authenticated_client.get('/api/gwa-records/statistics/?academic_year=2024-2025')
+        assert response.data['total_records'] == 1
+
+    def test_record_committed_mid_move_is_kept(self, gwa_record, student, user):
+        """Test that a record written between the copy and the delete stays in the hot table"""
+        from django.db import connection
+        from api.models import ArchivedGWARecord, GWARecord
+        late = {}
+
+        def write_after_copy(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            if sql.startswith('INSERT INTO "api_archivedgwarecord"') and not late:
+                late['record'] = GWARecord.objects.create(
+                    student=student, semester='2nd Semester', academic_year='2024-2025', gwa='1.25',
+                    encoded_by=user
+                )
+            return result
+
+        err = StringIO()
+        with connection.execute_wrapper(write_after_copy):
+            call_command('archive_academic_year', '2024-2025', stdout=StringIO(), stderr=err)
+
+        assert '1 GWA records for 2024-2025 were written during the move' in err.getvalue()
+
+        assert list(ArchivedGWARecord.objects.values_list('id', flat=True)) == [gwa_record.id]
+        assert list(GWARecord.objects.values_list('id', flat=True)) == [late['record'].id]
+
+    def test_archived_year_is_read_only(self, authenticated_client, gwa_record, student):
+        """Test that records can't be created in an archived year"""
+        call_command('archive_academic_year', '2024-2025', stdout=StringIO())
+        data = {'student_id': student.id, 'semester': '2nd Semester', 'academic_year': '2024-2025', 'gwa': 1.25}
+        response = authenticated_client.post('/api/gwa-records/', data, format='json')
+
+        assert response.status_code == 400
+        assert 'archived' in response.data['academic_year'][0]
+
+    def test_restore(self, gwa_record):
+        """Test that an archived year can be moved back"""
+        from api.models import AcademicYearArchive, GWARecord
+        call_command('archive_academic_year', '2024-2025', stdout=StringIO())
+        call_command('archive_academic_year', '2024-2025', restore=True, stdout=StringIO())
+
+        assert GWARecord.objects.get().id == gwa_record.id
+        assert not AcademicYearArchive.objects.exists()
+
+
+@pytest.mark.integration
+class TestBackfillStudentCourses:
+    """Test assigning courses to existing students"""
+
+    def test_assigns_only_unambiguous_courses(self, student, course, campus):
+        """Test that students get their department's course only when it offers exactly one"""
+        from api.models import Course, Department, Student
+        engineering = Department.objects.create(name='Engineering', code='ENG', campus=campus)
+        Course.objects.create(name='Civil Engineering', code='BSCE', department=engineering)
+        Course.objects.create(name='Electrical Engineering', code='BSEE', department=engineering)
+        undecided = Student.objects.create(
+            student_number='2024-009', first_name='Ana', last_name='Cruz', campus=campus,
+            year_level=1, department=engineering
+        )
+
+        out = StringIO()
+        call_command('backfill_student_courses', stdout=out)
+
+        student.refresh_from_db()
+        undecided.refresh_from_db()
+        assert student.course == course
+        assert undecided.course is None
+        assert 'Assigned a course to 1 students.' in out.getvalue()
+        assert '1 students are in departments with several courses' in out.getvalue()
+
+
+@pytest.mark.integration
+class TestGenerateHonorReports:
+    """Test the per-department honor list generator"""
+
+    def test_writes_reports_and_resumes(self, gwa_record, student, tmp_path):
+        """Test that reports are written per campus/department and existing ones are skipped"""
+        import csv
+        out = StringIO()
+        call_command('generate_honor_reports', '2024-2025', output_dir=str(tmp_path), workers=1, stdout=out)
+
+        report = tmp_path / '2024-2025' / 'TEST' / 'CS.csv'
+        with open(report, newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert [(row['rank'], row['student_number'], row['gwa']) for row in rows] == [('1', '2024-001', '1.50')]
+        assert '[1/1] TEST/CS.csv: 1 records' in out.getvalue()
+        assert [path.name for path in report.parent.iterdir()] == ['CS.csv']
+
+        out = StringIO()
+        call_command('generate_honor_reports', '2024-2025', output_dir=str(tmp_path), workers=1, stdout=out)
+        assert 'Skipping 1 existing reports' in out.getvalue()
+
+    def test_failed_report_leaves_no_partial_file(self, gwa_record, tmp_path, monkeypatch):
+        """Test that a failing department is reported and leaves no file behind"""
+        from django.core.management import CommandError
+        from api.management.commands import generate_honor_reports
+
+        def broken_writer(*args):
+            raise RuntimeError('disk full')
+        monkeypatch.setattr(generate_honor_reports.csv, 'writer', broken_writer)
+
+        with pytest.raises(CommandError, match='1 reports failed'):
+            call_command(
+                'generate_honor_reports', '2024-2025', output_dir=str(tmp_path), workers=1,
+                stdout=StringIO(), stderr=StringIO()
+            )
+        assert list((tmp_path / '2024-2025' / 'TEST').iterdir()) == []
+
+
+@pytest.mark.integration
+class TestRebuildGWATrends:
+    """Test rebuilding the GWA trend table"""
+
+    def test_rebuild_includes_archived_years(self, gwa_record, student, user):
+        """Test that a rebuild covers hot and archived years and replaces stale rows"""
+        from api.models import GWARecord, GWATrend
+        GWARecord.objects.create(
+            student=student, semester='2nd Semester', academic_year='2023-2024', gwa='2.25', encoded_by=user
+        )
+        call_command('archive_academic_year', '2023-2024', stdout=StringIO())
+        GWATrend.objects.create(
+            campus=student.campus, department=student.department, academic_year='2019-2020', semester='1st Semester',
+            record_count=9, gwa_total=900, best_gwa=100, worst_gwa=100, honor_count=9
+        )
+
+        out = StringIO()
+        call_command('rebuild_gwa_trends', stdout=out)
+
+        assert 'Rebuilt 2 GWA trend rows' in out.getvalue()
+        assert sorted(GWATrend.objects.values_list('academic_year', 'record_count', 'gwa_total', 'honor_count')) == [
+            ('2023-2024', 1, 225, 0), ('2024-2025', 1, 150, 1)
+        ]
+
+    def test_unknown_campus(self, db):
+        """Test that an unknown campus code is an error"""
+        from django.core.management.base import CommandError
+
+        with pytest.raises(CommandError):
+            call_command('rebuild_gwa_trends', campus=['NOPE'])
@@ -0,0 +1,123 @@
+import json
+import logging
+
+import pytest
+
+from honor_system.log import BoundedQueueHandler, JSONFormatter, SampleFilter, queue_handler, request_id_var
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def request_records():
+    handler = ListHandler()
+    request_logger = logging.getLogger('api.requests')
+    request_logger.addHandler(handler)
+    yield handler.records
+    request_logger.removeHandler(handler)
+
+
+@pytest.mark.unit
+class TestStructuredLogging:
+    """Test the JSON formatter, sampling and the bounded queue handler"""
+
+    def test_json_includes_extras_and_request_id(self):
+        """Test that caller extras and the request id become JSON fields"""
+        token = request_id_var.set('abc123')
+        try:
+            record = logging.makeLogRecord({'msg': 'hello %s', 'args': ('world',), 'levelname': 'INFO'})
+            record.request_id = request_id_var.get()
+            record.latency_ms = 12.5
+            entry = json.loads(JSONFormatter().format(record))
+        finally:
+            request_id_var.reset(token)
+        assert entry['message'] == 'hello world'
+        assert entry['request_id'] == 'abc123'
+        assert entry['latency_ms'] == 12.5
+
+    def test_sampling_keeps_warnings(self):
+        """Test that sampling only drops records below WARNING"""
+        sampler = SampleFilter(rate=0)
+        assert not sampler.filter(logging.makeLogRecord({'levelno': logging.INFO}))
+        assert sampler.filter(logging.makeLogRecord({'levelno': logging.WARNING}))
+
+    def test_full_queue_drops_and_reports(self):
+        """Test that a full queue drops records and later logs how many"""
+        target = ListHandler()
+        handler = BoundedQueueHandler(target, maxsize=2)
+        handler.listener.stop()
+        try:
+            for n in range(4):
+                handler.handle(logging.makeLogRecord({'msg': f'record {n}', 'levelno': logging.INFO}))
+            assert handler.dropped == 2
+
+            handler.listener.start()
+            handler.queue.join()
+            handler.handle(logging.makeLogRecord({'msg': 'after', 'levelno': logging.INFO}))
+            handler.queue.join()
+        finally:
+            handler.stop()
+        messages = [record.getMessage() for record in target.records]
+        assert messages == ['record 0', 'record 1', 'Log queue full, dropped records', 'after']
+        assert target.records[2].dropped == 2
+
+    def test_queue_handler_appends_json_to_file(self, tmp_path, capsys):
+        """Test that the configured queue writes JSON lines to stdout and appends them to the log file"""
+        path = tmp_path / 'app.log'
+        path.write_text('{"message": "earlier"}\n')
+        handler = queue_handler(filename=str(path))
+        try:
+            handler.handle(logging.makeLogRecord({'msg': 'kept', 'levelno': logging.INFO, 'levelname': 'INFO'}))
+            handler.handle(logging.makeLogRecord({'msg': 'too low', 'levelno': logging.DEBUG}))
+            handler.queue.join()
+        finally:
+            handler.stop()
+        lines = [json.loads(line)['message'] for line in path.read_text().splitlines()]
+        assert lines == ['earlier', 'kept']
+        assert json.loads(capsys.readouterr().out)['message'] == 'kept'
+
+
+@pytest.mark.integration
+class TestRequestLogMiddleware:
+    """Test per-request structured logs"""
+
+    def test_request_is_logged_with_context(self, authenticated_client, user, campus, request_records):
+        """Test that each request logs its route, user, latency and query count"""
+        response = authenticated_client.get(f'/api/campuses/{campus.id}/', HTTP_X_REQUEST_ID='req-42')
+        assert response['X-Request-ID'] == 'req-42'
+
+        record = request_records[-1]
+        assert record.request_id == 'req-42'
+        assert record.route == 'api/campuses/(?P<pk>[^/.]+)/$'
+        assert record.status == 200
+        assert record.user_id == user.id
+        assert record.query_count >= 1
+        assert record.latency_ms > 0
+
+    def test_error_responses_logged_with_request_id(self, authenticated_client):
+        """Test that django.request records for 4xx responses carry the request id"""
+        from honor_system.log import RequestContextFilter
+        handler = ListHandler()
+        handler.addFilter(RequestContextFilter())
+        django_logger = logging.getLogger('django.request')
+        django_logger.addHandler(handler)
+        try:
+            response = authenticated_client.get('/api/campuses/999999/', HTTP_X_REQUEST_ID='req-404')
+        finally:
+            django_logger.removeHandler(handler)
+
+        assert response.status_code == 404
+        assert [(record.status_code, record.request_id) for record in handler.records] == [(404, 'req-404')]
+
+    def test_invalid_request_id_is_replaced(self, api_client, request_records):
+        """Test that a malformed incoming request id is not trusted"""
+        response = api_client.get('/api/campuses/', HTTP_X_REQUEST_ID='bad id\nwith newline')
+        assert response['X-Request-ID'] != 'bad id\nwith newline'
+        assert len(response['X-Request-ID']) == 32
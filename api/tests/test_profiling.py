@@ -0,0 +1,59 @@
+import pytest
+from rest_framework import status
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.PROFILING_DIR = str(tmp_path)
+    settings.PROFILING_SECRET = 'profile-secret'
+    settings.PROFILING_SAMPLE_RATE = 0
+    return tmp_path
+
+
+@pytest.mark.integration
+class TestRequestProfiling:
+    """Test opt-in request profiling and the staff profile endpoints"""
+
+    def test_header_opts_in(self, authenticated_client, admin_user, gwa_record, profiling):
+        """Test that a request with the secret header is profiled and browsable by staff"""
+        response = authenticated_client.get('/api/gwa-records/', HTTP_X_PROFILE='profile-secret')
+        assert response.status_code == status.HTTP_200_OK
+        profile_id = response['X-Profile-Id']
+
+        authenticated_client.force_authenticate(user=admin_user)
+        listing = authenticated_client.get('/api/profiles/')
+        assert [profile['id'] for profile in listing.data] == [profile_id]
+        assert listing.data[0]['path'] == '/api/gwa-records/'
+
+        detail = authenticated_client.get(f'/api/profiles/{profile_id}/')
+        assert detail.data['query_count'] >= 1
+        assert any('api_gwarecord' in row['sql'] for row in detail.data['sql'])
+        assert any(row['function'] == 'to_representation' for row in detail.data['functions'])
+
+        download = authenticated_client.get(f'/api/profiles/{profile_id}/', {'download': 'pstats'})
+        assert download.status_code == status.HTTP_200_OK
+        assert (profiling / f'{profile_id}.prof').exists()
+
+    def test_wrong_secret_is_not_profiled(self, authenticated_client, profiling):
+        """Test that requests without the right header are left alone"""
+        response = authenticated_client.get('/api/campuses/', HTTP_X_PROFILE='guess')
+        assert 'X-Profile-Id' not in response
+        assert list(profiling.iterdir()) == []
+
+    def test_non_ascii_header_is_not_profiled(self, authenticated_client, profiling):
+        """Test that a non-ASCII header is compared safely instead of failing the request"""
+        response = authenticated_client.get('/api/campuses/', HTTP_X_PROFILE='s\xe9cret')
+        assert response.status_code == status.HTTP_200_OK
+        assert 'X-Profile-Id' not in response
+
+    def test_sampling(self, authenticated_client, settings, profiling):
+        """Test that a sample rate of 1 profiles every request"""
+        settings.PROFILING_SAMPLE_RATE = 1
+        authenticated_client.get('/api/campuses/')
+        authenticated_client.get('/api/campuses/')
+        assert len(list(profiling.glob('*.json'))) == 2
+
+    def test_profiles_are_staff_only(self, authenticated_client, profiling):
+        """Test that officers cannot browse profiles"""
+        response = authenticated_client.get('/api/profiles/')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
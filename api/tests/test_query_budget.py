@@ -0,0 +1,73 @@
+import logging
+
+import pytest
+from rest_framework import status
+
+from api.query_budget import QueryBudgetExceeded, QueryRecorder, enforce_budget, fingerprint_sql
+
+
+@pytest.mark.unit
+class TestFingerprintSQL:
+    """Test reducing SQL to its shape"""
+
+    def test_literals_and_in_lists_collapse(self):
+        """Test that statements differing only in values share a fingerprint"""
+        first = fingerprint_sql("SELECT * FROM api_student WHERE id IN (%s, %s) AND code = 'A'")
+        second = fingerprint_sql("SELECT *  FROM api_student WHERE id IN (%s, %s, %s) AND code = 'B'")
+        assert first == second == 'SELECT * FROM api_student WHERE id IN (...) AND code = ?'
+
+
+@pytest.mark.integration
+class TestQueryBudget:
+    """Test query budget enforcement"""
+
+    def test_raises_when_strict(self, db, settings, campus):
+        """Test that going over budget fails fast under tests"""
+        settings.QUERY_BUDGET_STRICT = True
+        from api.models import Campus
+        with QueryRecorder() as recorder:
+            list(Campus.objects.all())
+            list(Campus.objects.all())
+        with pytest.raises(QueryBudgetExceeded, match='2x SELECT'):
+            enforce_budget('campus_list', recorder, max_queries=1)
+
+    def test_logs_when_not_strict(self, db, settings, campus, caplog):
+        """Test that production logs a warning with the SQL fingerprints"""
+        settings.QUERY_BUDGET_STRICT = False
+        from api.models import Campus
+        with QueryRecorder() as recorder:
+            for _ in range(3):
+                Campus.objects.get(pk=campus.pk)
+        with caplog.at_level(logging.WARNING, logger='api.query_budget'):
+            enforce_budget('campus_detail', recorder, max_queries=2)
+        record = caplog.records[-1]
+        assert record.view == 'campus_detail'
+        assert record.query_count == 3
+        assert record.fingerprints[0]['count'] == 3
+
+
+@pytest.mark.integration
+class TestRouterQueryBudgets:
+    """Every router endpoint stays within its budget and runs a constant number of queries"""
+
+    def test_list(self, api_client, admin_user, campus_dataset, router_endpoint):
+        prefix, viewset = router_endpoint
+        api_client.force_authenticate(user=admin_user)
+        campus_dataset()
+        with QueryRecorder() as few:
+            response = api_client.get(f'/api/{prefix}/')
+        assert response.status_code == status.HTTP_200_OK
+
+        for _ in range(3):
+            campus_dataset()
+        with QueryRecorder() as many:
+            response = api_client.get(f'/api/{prefix}/')
+        assert response.status_code == status.HTTP_200_OK
+        assert many.count == few.count, many.fingerprints()
+
+    def test_retrieve(self, api_client, admin_user, campus_dataset, router_endpoint):
+        prefix, viewset = router_endpoint
+        api_client.force_authenticate(user=admin_user)
+        obj = campus_dataset()[prefix]
+        response = api_client.get(f'/api/{prefix}/{obj.pk}/')
+        assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,115 @@
+import pytest
+from rest_framework import status
+
+
+@pytest.mark.integration
+class TestSyncAPI:
+    """Test the incremental change feed"""
+
+    @pytest.fixture(autouse=True)
+    def no_sync_lag(self, settings):
+        settings.SYNC_LAG_SECONDS = 0
+
+    def sync(self, client, since=None, limit=None):
+        params = {}
+        if since:
+            params['since'] = since
+        if limit:
+            params['limit'] = limit
+        response = client.get('/api/sync/', params)
+        assert response.status_code == status.HTTP_200_OK
+        return response.data
+
+    def test_full_then_incremental(self, authenticated_client, gwa_record, course):
+        """Test that a second sync returns only what changed since the first"""
+        gwa_record.student.course = course
+        gwa_record.student.save()
+        first = self.sync(authenticated_client)
+        assert len(first['changes']['campuses']) == 1
+        assert [r['course_id'] for r in first['changes']['students']] == [course.id]
+        assert first['changes']['gwa_records'][0]['gwa'] == '1.50'
+        assert first['changes']['gwa_records'][0]['version'] == 1
+        assert first['has_more'] is False
+
+        empty = self.sync(authenticated_client, first['next'])
+        assert all(rows == [] for rows in empty['changes'].values())
+        assert empty['deleted'] == []
+
+        gwa_record.gwa = '1.25'
+        gwa_record.save()
+        course_id = course.id
+        course.delete()
+
+        changed = self.sync(authenticated_client, empty['next'])
+        assert [r['id'] for r in changed['changes']['gwa_records']] == [gwa_record.id]
+        assert changed['changes']['students'] == []
+        assert [(d['model'], d['object_id']) for d in changed['deleted']] == [('course', course_id)]
+
+    def test_paging(self, authenticated_client, campus, department):
+        """Test that large feeds are split into bounded pages without gaps"""
+        from api.models import Student
+        Student.objects.bulk_create([
+            Student(
+                student_number=f'2024-{i:03d}', first_name='F', last_name='L',
+                campus=campus, year_level=1, department=department
+            )
+            for i in range(7)
+        ])
+
+        seen, token, pages = [], None, 0
+        while True:
+            data = self.sync(authenticated_client, token, limit=3)
+            seen += [r['student_number'] for r in data['changes']['students']]
+            token, pages = data['next'], pages + 1
+            if not data['has_more']:
+                break
+
+        assert sorted(seen) == [f'2024-{i:03d}' for i in range(7)]
+        assert pages == 4
+
+    def test_scoped_to_officer_campus(self, authenticated_client, student):
+        """Test that other campuses' rows are not synced"""
+        from api.models import Campus
+        Campus.objects.create(name='Other Campus', code='OTH')
+
+        data = self.sync(authenticated_client)
+        assert [c['code'] for c in data['changes']['campuses']] == ['TEST']
+
+    def test_cascade_tombstones_written_together(self, gwa_record, student, user):
+        """Test that a delete cascading to many rows writes all their tombstones with one INSERT"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from api.models import GWARecord, Tombstone
+        for year in range(2015, 2020):
+            GWARecord.objects.create(
+                student=student, semester='1st Semester', academic_year=f'{year}-{year + 1}', gwa='1.50',
+                encoded_by=user
+            )
+        record_ids = set(GWARecord.objects.values_list('id', flat=True))
+        student_id = student.pk
+
+        with CaptureQueriesContext(connection) as context:
+            student.delete()
+
+        inserts = [q for q in context.captured_queries if q['sql'].startswith('INSERT INTO "api_tombstone"')]
+        assert len(inserts) == 1
+        assert set(Tombstone.objects.values_list('model', 'object_id')) == (
+            {('gwarecord', pk) for pk in record_ids} | {('student', student_id)}
+        )
+
+    @pytest.mark.parametrize('token', ['not-a-token', 'W10=', 'NQ==', 'Ingi'])
+    def test_invalid_token(self, authenticated_client, token):
+        """Test that a malformed token, or JSON other than an object, is rejected"""
+        response = authenticated_client.get('/api/sync/', {'since': token})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize('stage', [-1, 6, '0', 1.5, True])
+    def test_invalid_token_stage(self, authenticated_client, stage):
+        """Test that a token pointing outside the feed's stages is rejected"""
+        import base64
+        import json
+        token = base64.urlsafe_b64encode(json.dumps(
+            {'s': None, 'u': '2024-01-01T00:00:00+00:00', 'st': stage, 'a': None}
+        ).encode()).decode()
+        response = authenticated_client.get('/api/sync/', {'since': token})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,66 @@
+import pytest
+from rest_framework import status
+
+from api.throttling import throttle_metrics
+
+
+@pytest.fixture
+def low_rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'anon': '100/hour', 'user': '10/hour', 'analytics': '20/hour'},
+    }
+
+
+@pytest.mark.integration
+class TestCostWeightedThrottle:
+    """Test token-bucket throttling weighted by ViewSet action"""
+
+    def test_list_spends_more_than_retrieve(self, authenticated_client, campus, low_rates):
+        """Test that list calls drain the bucket at their configured cost"""
+        for _ in range(5):
+            assert authenticated_client.get('/api/campuses/').status_code == status.HTTP_200_OK
+
+        response = authenticated_client.get('/api/campuses/')
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response['Retry-After']) > 0
+
+    def test_analytics_do_not_starve_cheap_calls(self, authenticated_client, campus, gwa_record, low_rates):
+        """Test that expensive aggregates have their own bucket"""
+        for _ in range(2):
+            assert authenticated_client.get('/api/gwa-records/statistics/').status_code == status.HTTP_200_OK
+        response = authenticated_client.get('/api/gwa-records/statistics/')
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+        response = authenticated_client.get(f'/api/campuses/{campus.id}/')
+        assert response.status_code == status.HTTP_200_OK
+
+        metrics = throttle_metrics()
+        assert metrics['analytics'] == {'allowed': 2, 'throttled': 1}
+        assert metrics['user'] == {'allowed': 1, 'throttled': 0}
+
+    def test_metrics_endpoint_is_staff_only(self, authenticated_client, api_client, admin_user, campus, low_rates):
+        """Test that staff can read the throttle counts and officers cannot"""
+        assert authenticated_client.get('/api/throttle-metrics/').status_code == status.HTTP_403_FORBIDDEN
+
+        api_client.force_authenticate(user=admin_user)
+        response = api_client.get('/api/throttle-metrics/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['user'] == {'allowed': 1, 'throttled': 0}
+
+    def test_metrics_counted_in_memory_and_summed_across_processes(self, authenticated_client, campus, monkeypatch):
+        """Test that requests publish metrics at most once per interval and totals include other workers"""
+        from api.throttling import CostWeightedThrottle, metrics
+        cache = CostWeightedThrottle.cache
+        writes = []
+        set_ = cache.set
+        monkeypatch.setattr(cache, 'set', lambda key, *args, **kwargs: (writes.append(key), set_(key, *args, **kwargs)))
+
+        for _ in range(3):
+            authenticated_client.get(f'/api/campuses/{campus.id}/')
+        assert len([key for key in writes if key.startswith('throttle_metrics_')]) == 2  # counts + registration
+
+        # Another worker's published counts
+        cache.set('throttle_metrics_1', {('user', True): 5, ('user', False): 2})
+        cache.set(metrics.processes_key, cache.get(metrics.processes_key) | {1})
+        assert throttle_metrics()['user'] == {'allowed': 8, 'throttled': 2}
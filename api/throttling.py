@@ -0,0 +1,151 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+
+class CostWeightedThrottle(SimpleRateThrottle):
+    """Token-bucket throttle where each request spends the cost of its view action.
+
+    Views map actions to a throttle scope (`throttle_scopes`) and a cost
+    (`throttle_costs`); anything unlisted goes to the `user` scope at cost 1.
+    Each scope is a separate bucket per user (or per IP when anonymous) holding
+    the scope's rate in tokens and refilling continuously over its period, so
+    heavy analytics calls drain their own bucket instead of the one cheap
+    calls use. Buckets live in the shared cache.
+    """
+    cache_format = 'throttle_bucket_%(scope)s_%(ident)s'
+    default_scope = 'user'
+    default_cost = 1
+
+    def __init__(self):
+        # The rate depends on the scope of the action being throttled
+        pass
+
+    def get_scope_and_cost(self, view):
+        action = getattr(view, 'action', None)
+        scope = getattr(view, 'throttle_scopes', {}).get(action, self.default_scope)
+        cost = getattr(view, 'throttle_costs', {}).get(action, self.default_cost)
+        return scope, cost
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        self.scope, cost = self.get_scope_and_cost(view)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(rate)
+        refill_per_second = self.num_requests / self.duration
+
+        self.key = self.get_cache_key(request, view)
+        now = self.timer()
+        tokens, updated_at = self.cache.get(self.key, (self.num_requests, now))
+        tokens = min(self.num_requests, tokens + (now - updated_at) * refill_per_second)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+            self.wait_seconds = None
+        else:
+            self.wait_seconds = (cost - tokens) / refill_per_second
+        # Read-modify-write without a lock: concurrent requests may each spend
+        # the same tokens, which only errs in the client's favour
+        self.cache.set(self.key, (tokens, now), self.duration)
+
+        record_decision(self.scope, allowed)
+        if not allowed:
+            logger.info(
+                'Request throttled',
+                extra={
+                    'throttle_scope': self.scope,
+                    'throttle_cost': cost,
+                    'throttle_ident': self.key,
+                    'action': getattr(view, 'action', None),
+                    'wait_seconds': round(self.wait_seconds, 1),
+                }
+            )
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class ThrottleMetrics:
+    """Allowed/throttled decision counts per scope, counted in process memory.
+
+    Counting costs no cache write per request. Each process publishes its
+    counts to the shared cache under a key of its own, at most every
+    PUBLISH_INTERVAL seconds, so workers never overwrite (or lose) each
+    other's increments; reading sums every published process.
+    """
+    PUBLISH_INTERVAL = 60
+    # Published counts outlive recycled workers for this long
+    TIMEOUT = 7 * 24 * 3600
+    processes_key = 'throttle_metrics_processes'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._published_at = 0.0
+
+    def record(self, scope, allowed):
+        with self._lock:
+            self._counts[scope, allowed] += 1
+            due = time.monotonic() - self._published_at >= self.PUBLISH_INTERVAL
+        if due:
+            self.publish()
+
+    def publish(self):
+        """Store this process's counts in the shared cache"""
+        cache = CostWeightedThrottle.cache
+        pid = os.getpid()
+        with self._lock:
+            counts = dict(self._counts)
+            self._published_at = time.monotonic()
+        cache.set(f'throttle_metrics_{pid}', counts, self.TIMEOUT)
+        # Registration races are repaired by the next publish
+        processes = cache.get(self.processes_key, set())
+        if pid not in processes:
+            cache.set(self.processes_key, processes | {pid}, self.TIMEOUT)
+
+    def totals(self):
+        """Counts per throttle scope summed over every process that published"""
+        self.publish()
+        cache = CostWeightedThrottle.cache
+        processes = cache.get(self.processes_key, set())
+        counts = Counter()
+        for published in cache.get_many([f'throttle_metrics_{pid}' for pid in processes]).values():
+            counts.update(published)
+        return {
+            scope: {'allowed': counts[scope, True], 'throttled': counts[scope, False]}
+            for scope in sorted(api_settings.DEFAULT_THROTTLE_RATES)
+        }
+
+    def reset(self):
+        with self._lock:
+            self._counts = Counter()
+            self._published_at = 0.0
+
+
+metrics = ThrottleMetrics()
+
+
+def record_decision(scope, allowed):
+    metrics.record(scope, allowed)
+
+
+def throttle_metrics():
+    """Allowed/throttled request counts per throttle scope across this host's workers"""
+    return metrics.totals()
@@ -0,0 +1,179 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import HonorSocietyOfficer
+from .scoping import CAMPUS_CLAIM
+
+
+class BlacklistCache:
+    """In-process set of blacklisted refresh token JTIs.
+
+    The set is loaded once and then kept current by reading only the
+    `BlacklistedToken` rows with a primary key above the last one seen, so a
+    check costs a primary-key range scan however large the tables grow.
+    Ids are assigned at insert but may commit out of order, so ids skipped
+    over are remembered as gaps and looked up by primary key on each sync
+    until they turn up or are TOKEN_BLACKLIST_SYNC_LAG seconds old.
+    Blacklisting done by other processes becomes visible on their next sync.
+    """
+
+    # Seconds between sweeps of expired JTIs out of the set
+    EXPIRY_SWEEP_INTERVAL = 300
+    # Most skipped ids tracked at once; a larger jump only tracks the ids just below it
+    MAX_GAPS = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._expiry_by_jti = {}
+        self._last_id = None
+        # Skipped id -> monotonic time it was found missing
+        self._gaps = {}
+        self._synced_at = 0.0
+        self._swept_at = 0.0
+
+    @property
+    def is_warm(self):
+        return self._last_id is not None
+
+    def warm(self):
+        """Load every unexpired blacklisted JTI"""
+        now = timezone.now()
+        rows = BlacklistedToken.objects.filter(token__expires_at__gt=now).values_list(
+            'token__jti', 'token__expires_at'
+        )
+        last_id = BlacklistedToken.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        # Ids missing among those written within the lag may still be uncommitted
+        settled_id = BlacklistedToken.objects.filter(
+            blacklisted_at__lt=now - timedelta(seconds=settings.TOKEN_BLACKLIST_SYNC_LAG)
+        ).aggregate(last_id=Max('id'))['last_id'] or 0
+        recent = set(BlacklistedToken.objects.filter(id__gt=settled_id).values_list('id', flat=True))
+        with self._lock:
+            self._expiry_by_jti = dict(rows)
+            self._last_id = settled_id
+            synced_at = time.monotonic()
+            self._gaps = {}
+            self._track(sorted(recent | {last_id}), synced_at)
+            self._synced_at = self._swept_at = synced_at
+
+    def _track(self, ids, found_at):
+        # Advance past ids seen in ascending order, remembering the ones skipped
+        for pk in ids:
+            self._gaps.pop(pk, None)
+            if pk > self._last_id:
+                for missing in range(max(self._last_id + 1, pk - self.MAX_GAPS), pk):
+                    self._gaps[missing] = found_at
+                self._last_id = pk
+        if len(self._gaps) > self.MAX_GAPS:
+            self._gaps = dict(sorted(self._gaps.items())[-self.MAX_GAPS:])
+
+    def sync(self):
+        """Pull blacklist entries committed since the last sync and forget expired ones"""
+        if not self.is_warm:
+            self.warm()
+            return
+
+        now = time.monotonic()
+        if now - self._synced_at < settings.TOKEN_BLACKLIST_SYNC_INTERVAL:
+            return
+
+        settled = now - settings.TOKEN_BLACKLIST_SYNC_LAG
+        with self._lock:
+            self._gaps = {pk: found_at for pk, found_at in self._gaps.items() if found_at > settled}
+            new = Q(id__gt=self._last_id)
+            if self._gaps:
+                new |= Q(id__in=sorted(self._gaps))
+        rows = list(
+            BlacklistedToken.objects.filter(new).order_by('id').values_list('id', 'token__jti', 'token__expires_at')
+        )
+        with self._lock:
+            for pk, jti, expires_at in rows:
+                self._expiry_by_jti[jti] = expires_at
+            self._track([pk for pk, jti, expires_at in rows], now)
+            self._synced_at = now
+        if now - self._swept_at >= self.EXPIRY_SWEEP_INTERVAL:
+            self.discard_expired()
+
+    def add(self, jti, expires_at):
+        """Record a token blacklisted by this process"""
+        with self._lock:
+            self._expiry_by_jti[jti] = expires_at
+
+    def discard_expired(self):
+        """Forget JTIs whose tokens have expired and can no longer be presented"""
+        now = timezone.now()
+        with self._lock:
+            self._expiry_by_jti = {
+                jti: expires_at for jti, expires_at in self._expiry_by_jti.items() if expires_at > now
+            }
+            self._swept_at = time.monotonic()
+
+    def reset(self):
+        with self._lock:
+            self._expiry_by_jti = {}
+            self._last_id = None
+            self._gaps = {}
+            self._synced_at = 0.0
+            self._swept_at = 0.0
+
+    def __contains__(self, jti):
+        self.sync()
+        return jti in self._expiry_by_jti
+
+    def __len__(self):
+        return len(self._expiry_by_jti)
+
+
+blacklist_cache = BlacklistCache()
+
+
+class CachedRefreshToken(RefreshToken):
+    """Refresh token that checks the blacklist through the in-process cache"""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if jti in blacklist_cache:
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        blacklisted, created = super().blacklist()
+        blacklist_cache.add(blacklisted.token.jti, blacklisted.token.expires_at)
+        return blacklisted, created
+
+
+class CampusRefreshToken(CachedRefreshToken):
+    """Refresh token that re-reads the officer's campus each time it is used.
+
+    The campus claim set at login is otherwise copied into every access token
+    and, with rotation, every new refresh token, so an officer moved to
+    another campus would keep the old scope for as long as they keep
+    refreshing. Officers no longer active or verified cannot refresh.
+    """
+
+    def verify(self):
+        super().verify()
+        if CAMPUS_CLAIM not in self.payload:
+            # Staff tokens carry no campus
+            return
+        campus_id = (
+            HonorSocietyOfficer.objects.filter(
+                user_id=self.payload[api_settings.USER_ID_CLAIM], is_active=True, is_verified=True
+            ).values_list('campus_id', flat=True).first()
+        )
+        if campus_id is None:
+            raise TokenError(_('User is no longer an active officer'))
+        self.payload[CAMPUS_CLAIM] = campus_id
+
+
+class CachedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = CampusRefreshToken
@@ -0,0 +1,162 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+
+from .analytics import GWA_HUNDREDTHS
+from .models import ArchivedGWARecord, GWARecord, GWATrend, HonorPolicy, Student
+
+TREND_FIELDS = ['record_count', 'gwa_total', 'best_gwa', 'worst_gwa', 'honor_count']
+
+
+def _scoped(queryset, prefix, campuses, departments, academic_years):
+    if campuses is not None:
+        queryset = queryset.filter(**{f'{prefix}campus_id__in': campuses})
+    if departments is not None:
+        queryset = queryset.filter(**{f'{prefix}department_id__in': departments})
+    if academic_years is not None:
+        queryset = queryset.filter(academic_year__in=academic_years)
+    return queryset
+
+
+def build_trends(model, campuses=None, departments=None, academic_years=None):
+    """Unsaved GWATrend rows for the records of `model` in scope.
+
+    One grouped query per campus and academic year, since each pair may have
+    its own honor policy.
+    """
+    records = _scoped(model.objects.order_by(), 'student__', campuses, departments, academic_years)
+    trends = []
+    for campus_id, academic_year in records.values_list('student__campus_id', 'academic_year').distinct():
+        policy = HonorPolicy.resolve(campus_id, academic_year)
+        buckets = (
+            records.filter(student__campus_id=campus_id, academic_year=academic_year)
+            .values('student__department_id', 'semester')
+            .annotate(
+                record_count=Count('id'),
+                gwa_total=Sum(GWA_HUNDREDTHS),
+                best_gwa=Min(GWA_HUNDREDTHS),
+                worst_gwa=Max(GWA_HUNDREDTHS),
+                honor_count=Count('id', filter=policy.compile(model)),
+            )
+        )
+        for bucket in buckets:
+            trends.append(GWATrend(
+                campus_id=campus_id, department_id=bucket.pop('student__department_id'),
+                academic_year=academic_year, **bucket
+            ))
+    return trends
+
+
+def refresh_trends(campuses=None, departments=None, academic_years=None):
+    """Recompute the trend rows in scope (all of them when unscoped), returning how many there are.
+
+    Archived years are read from the archive table, so trends span every year.
+    """
+    with transaction.atomic():
+        trends = []
+        for model in (GWARecord, ArchivedGWARecord):
+            trends += build_trends(model, campuses, departments, academic_years)
+        _scoped(GWATrend.objects.all(), '', campuses, departments, academic_years).delete()
+        # A concurrent refresh of the same rows may have inserted them since the delete
+        GWATrend.objects.bulk_create(
+            trends, update_conflicts=True,
+            unique_fields=['campus', 'department', 'academic_year', 'semester'],
+            update_fields=TREND_FIELDS + ['refreshed_at']
+        )
+    return len(trends)
+
+
+def _bound(values):
+    return None if values is None else frozenset(values)
+
+
+def merge_scopes(scopes):
+    """Union scopes limited along the same dimensions, so a transaction's writes refresh once per kind of scope"""
+    merged = {}
+    for scope in scopes:
+        shape = tuple(values is None for values in scope)
+        if shape not in merged:
+            merged[shape] = scope
+        else:
+            merged[shape] = tuple(
+                None if values is None else values | more for values, more in zip(merged[shape], scope)
+            )
+    return list(merged.values())
+
+
+class PendingRefresh:
+    """Trend scopes written to on a connection, refreshed together once the transaction commits.
+
+    Every write queues an on-commit call to `flush`; the first to run after
+    the commit refreshes every scope collected so far and the rest find
+    nothing to do. Scopes left by a rolled back transaction are refreshed with
+    the next commit, which recomputes them harmlessly.
+
+    Every refresh recomputes whole department/semester rows from the records
+    rather than applying deltas: best/worst GWA and policy-based honor counts
+    (min_semesters, failing_gwa) can't be maintained from a single row's change.
+    """
+
+    def __init__(self):
+        # (student_id, academic_year) of written GWA records, resolved to departments in one query
+        self.record_keys = set()
+        # (campuses, departments, academic_years), each a frozenset or None for all
+        self.scopes = set()
+
+    @classmethod
+    def current(cls, connection):
+        """The refresh collecting the connection's writes, starting one if needed"""
+        pending = getattr(connection, 'pending_trend_refresh', None)
+        if pending is None:
+            pending = connection.pending_trend_refresh = cls()
+        return pending
+
+    @classmethod
+    def flush(cls, connection):
+        """Refresh every scope collected on the connection"""
+        pending = getattr(connection, 'pending_trend_refresh', None)
+        if pending is None:
+            return
+        connection.pending_trend_refresh = None
+        pending.refresh()
+
+    def refresh(self):
+        scopes = set(self.scopes)
+        if self.record_keys:
+            students = {student_id for student_id, academic_year in self.record_keys}
+            department_by_student = dict(Student.objects.filter(pk__in=students).values_list('id', 'department_id'))
+            # Records of deleted students are covered by the refresh their deletion scheduled
+            pairs = {
+                (department_by_student[student_id], academic_year)
+                for student_id, academic_year in self.record_keys
+                if student_id in department_by_student
+            }
+            if pairs:
+                scopes.add((
+                    None,
+                    frozenset(department for department, academic_year in pairs),
+                    frozenset(academic_year for department, academic_year in pairs),
+                ))
+        for campuses, departments, academic_years in merge_scopes(scopes):
+            refresh_trends(campuses, departments, academic_years)
+
+
+def _queue(connection):
+    # Outside a transaction this runs at once. A failed refresh is logged
+    # rather than failing the write; `manage.py rebuild_gwa_trends` repairs drift
+    transaction.on_commit(partial(PendingRefresh.flush, connection), robust=True)
+
+
+def schedule_refresh(campuses=None, departments=None, academic_years=None):
+    """Refresh trends in scope once the current transaction commits (at once outside one)"""
+    connection = transaction.get_connection()
+    PendingRefresh.current(connection).scopes.add((_bound(campuses), _bound(departments), _bound(academic_years)))
+    _queue(connection)
+
+
+def schedule_record_refresh(student_id, academic_year):
+    """Refresh the trend rows of a written GWA record once the current transaction commits"""
+    connection = transaction.get_connection()
+    PendingRefresh.current(connection).record_keys.add((student_id, academic_year))
+    _queue(connection)
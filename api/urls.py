@@ -11,7 +11,12 @@ from .views import (
     login_view,
     logout_view,
     token_refresh_view,
-    user_profile
+    user_profile,
+    sync_view,
+    hierarchy_view,
+    profile_list,
+    profile_detail,
+    throttle_metrics_view
 )
 
 # Create a router and register our viewsets with it
@@ -30,6 +35,19 @@ urlpatterns = [
     path('auth/logout/', logout_view, name='logout'),
     path('auth/refresh/', token_refresh_view, name='token_refresh'),
     path('auth/profile/', user_profile, name='user_profile'),
+
+    # Incremental sync for offline-capable clients
+    path('sync/', sync_view, name='sync'),
+
+    # Campus -> department -> course tree for filter dropdowns
+    path('hierarchy/', hierarchy_view, name='hierarchy'),
+
+    # Request profiles captured by ProfilingMiddleware (staff only)
+    path('profiles/', profile_list, name='profile_list'),
+    path('profiles/<str:profile_id>/', profile_detail, name='profile_detail'),
+
+    # Allowed/throttled counts per throttle scope (staff only)
+    path('throttle-metrics/', throttle_metrics_view, name='throttle_metrics'),
     
     # API endpoints
     path('', include(router.urls)),
@@ -1,19 +1,46 @@
+import threading
+
 from rest_framework import viewsets, filters
 from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
+from django.conf import settings
+from django.core.cache import cache
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.http import FileResponse, Http404
 from django.utils import timezone
-from .models import Campus, Department, Course, Student, GWARecord, HonorSocietyOfficer
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from .models import (
+    Campus, Department, Course, Student, GWARecord, HonorSocietyOfficer, AcademicYearArchive, ArchivedGWARecord,
+    HonorPolicy, GWARecordHistory, GWATrend
+)
+from .analytics import GWA_HUNDREDTHS, GWADistribution, format_hundredths, hundredths_to_decimal, parse_hundredths
+from .cache import bump_version, versioned_key
+from .hierarchy import build_hierarchy, hierarchy_etag
+from .idempotency import idempotent
+from .profiling import ProfileStore
+from .throttling import throttle_metrics
+from .query_budget import QueryBudgetMixin, query_budget
+from .roster import RosterError, RosterImport, read_rows
+from .scoping import CAMPUS_CLAIM, NO_CAMPUS, get_campus_scope, scope_queryset
+from .sync import SyncCursor, read_changes
+from .tokens import CachedRefreshToken, CampusRefreshToken
+from .trends import schedule_refresh
 from .serializers import (
     CampusSerializer,
     DepartmentSerializer,
     CourseSerializer,
     StudentSerializer,
     GWARecordSerializer,
+    GWAEditSerializer,
+    GWAField,
+    GWAUpsertSerializer,
+    GWARecordHistorySerializer,
     HonorSocietyOfficerSerializer,
     UserSerializer
 )
@@ -21,7 +48,13 @@ from django.utils import timezone
 
 # Create your views here.
 
+# Password hashing is CPU bound; bounding it per process keeps a login burst
+# from occupying every worker thread. Logins over the bound are turned away
+# at once, as waiting for a slot would hold a thread just the same
+_login_slots = threading.BoundedSemaphore(settings.LOGIN_CONCURRENCY)
+
 # JWT Authentication Views
+@query_budget(max_queries=6, max_db_ms=250)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def login_view(request):
@@ -31,12 +64,21 @@ def login_view(request):
     if not (username and password):
         return Response({'error': 'Username and password are required.'}, status=400)
 
-    user = authenticate(request, username=username, password=password)
+    if not _login_slots.acquire(blocking=False):
+        return Response(
+            {'error': 'Too many logins in progress. Please try again shortly.'},
+            status=503,
+            headers={'Retry-After': '1'}
+        )
+    try:
+        user = authenticate(request, username=username, password=password)
+    finally:
+        _login_slots.release()
     if not user:
         return Response({'error': 'Invalid credentials.'}, status=401)
 
     try:
-        member = HonorSocietyOfficer.objects.get(user=user)
+        member = HonorSocietyOfficer.objects.select_related('campus').get(user=user)
     except HonorSocietyOfficer.DoesNotExist:
         return Response({'error': 'User is not an officer.'}, status=403)
 
@@ -46,7 +88,10 @@ def login_view(request):
     if not member.is_verified:
         return Response({'error': 'Your account is pending admin verification.'}, status=403)
 
-    refresh = RefreshToken.for_user(user)
+    refresh = CachedRefreshToken.for_user(user)
+    # Carried into the access token so campus scoping needs no per-request lookup
+    if not (user.is_staff or user.is_superuser):
+        refresh[CAMPUS_CLAIM] = member.campus_id
     return Response({
         'refresh': str(refresh),
         'access': str(refresh.access_token),
@@ -61,7 +106,7 @@ def logout_view(request):
     try:
         refresh_token = request.data.get('refresh')
         if refresh_token:
-            token = RefreshToken(refresh_token)
+            token = CachedRefreshToken(refresh_token)
             token.blacklist()
             return Response({'message': 'Successfully logged out.'}, status=200)
         return Response({'error': 'Refresh token is required.'}, status=400)
@@ -77,31 +122,130 @@ def token_refresh_view(request):
         if not refresh_token:
             return Response({'error': 'Refresh token is required.'}, status=400)
         
-        refresh = RefreshToken(refresh_token)
+        refresh = CampusRefreshToken(refresh_token)
         return Response({
             'access': str(refresh.access_token),
         })
     except Exception as e:
         return Response({'error': 'Invalid refresh token.'}, status=401)
 
+@query_budget(max_queries=3, max_db_ms=100)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def user_profile(request):
-    try:
-        member = HonorSocietyOfficer.objects.get(user=request.user)
-        return Response({
-            'user': UserSerializer(request.user).data,
+    # Clients poll this on every navigation; user, officer and campus writes bump the version
+    key = versioned_key('officers', 'profile', request.user.pk)
+    profile = cache.get(key)
+    if profile is None:
+        try:
+            member = HonorSocietyOfficer.objects.select_related('user', 'campus').get(user=request.user)
+        except HonorSocietyOfficer.DoesNotExist:
+            return Response({'error': 'User is not an officer.'}, status=403)
+        profile = {
+            'user': UserSerializer(member.user).data,
             'member': HonorSocietyOfficerSerializer(member).data
-        })
-    except HonorSocietyOfficer.DoesNotExist:
+        }
+        cache.set(key, profile, settings.PROFILE_CACHE_TIMEOUT)
+    return Response(profile)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync_view(request):
+    """Rows changed or deleted since the client's last sync token, in bounded pages"""
+    try:
+        cursor = SyncCursor.decode(request.query_params.get('since'))
+        limit = min(int(request.query_params.get('limit', 500)), 1000)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    if limit < 1:
+        return Response({'error': 'limit must be positive.'}, status=400)
+
+    scope = get_campus_scope(request)
+    if scope == NO_CAMPUS:
+        return Response({'error': 'User is not an officer.'}, status=403)
+
+    changes, next_cursor, has_more = read_changes(cursor, scope, limit)
+    deleted = changes.pop('deleted')
+    return Response({
+        'changes': changes,
+        'deleted': deleted,
+        'next': next_cursor.encode(),
+        'has_more': has_more,
+    })
+
+@query_budget(max_queries=5)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def hierarchy_view(request):
+    """The whole campus -> department -> course tree, for filter dropdowns"""
+    scope = get_campus_scope(request)
+    if scope == NO_CAMPUS:
         return Response({'error': 'User is not an officer.'}, status=403)
 
+    key = versioned_key('hierarchy', scope)
+    cached = cache.get(key)
+    if cached is None:
+        tree = build_hierarchy(campus_id=scope)
+        cached = {'etag': hierarchy_etag(tree), 'tree': tree}
+        # Writes change the version key; the timeout only clears out orphaned versions
+        cache.set(key, cached, 60 * 60 * 24)
+
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+    if cached['etag'] in if_none_match or '*' in if_none_match:
+        response = Response(status=304)
+    else:
+        response = Response(cached['tree'])
+    response['ETag'] = cached['etag']
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_list(request):
+    """Stored request profiles, newest first"""
+    return Response(ProfileStore().list())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_detail(request, profile_id):
+    """One request profile; ?download=pstats returns the raw cProfile dump for flamegraph tools"""
+    store = ProfileStore()
+    if request.query_params.get('download') == 'pstats':
+        path = store.pstats_path(profile_id)
+        if path is None:
+            return Response({'error': 'Profile not found.'}, status=404)
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name)
+
+    profile = store.get(profile_id)
+    if profile is None:
+        return Response({'error': 'Profile not found.'}, status=404)
+    return Response(profile)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def throttle_metrics_view(request):
+    """Allowed and throttled request counts per throttle scope"""
+    return Response(throttle_metrics())
+
 # CRUD ViewSets
 
-class BaseViewSet(viewsets.ModelViewSet):
+class BaseViewSet(QueryBudgetMixin, viewsets.ModelViewSet):
     """Base ViewSet with common functionality"""
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    # Lookup path from the model to its Campus; officers only see their own campus.
+    # Staff users are never scoped. None disables scoping for the ViewSet.
+    campus_field = None
+    # Token cost per action for CostWeightedThrottle; unlisted actions cost 1
+    throttle_costs = {'list': 2}
+    # Cascading deletes (and their tombstones) scale with the related rows
+    query_budgets = {'destroy': None}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.campus_field is None:
+            return queryset
+        return scope_queryset(queryset, self.request, self.campus_field)
 
 class CampusViewSet(BaseViewSet):
     queryset = Campus.objects.all()
@@ -111,8 +255,9 @@ class CampusViewSet(BaseViewSet):
     ordering = ['name']
 
 class DepartmentViewSet(BaseViewSet):
-    queryset = Department.objects.all()
+    queryset = Department.objects.select_related('campus')
     serializer_class = DepartmentSerializer
+    campus_field = 'campus'
     search_fields = ['name', 'code', 'campus__name']
     ordering_fields = ['name', 'code', 'campus__name']
     ordering = ['name']
@@ -122,9 +267,27 @@ class DepartmentViewSet(BaseViewSet):
         campus_id = self.request.query_params.get('campus')
         return queryset.filter(campus_id=campus_id) if campus_id else queryset
 
+    def check_campus(self, serializer):
+        """Officers may only keep departments on their own campus"""
+        scope = get_campus_scope(self.request)
+        if scope is None:
+            return
+        campus_id = serializer.validated_data.get('campus_id', getattr(serializer.instance, 'campus_id', None))
+        if campus_id != scope:
+            raise PermissionDenied({'error': 'You can only manage departments of your own campus.'})
+
+    def perform_create(self, serializer):
+        self.check_campus(serializer)
+        serializer.save()
+
+    def perform_update(self, serializer):
+        self.check_campus(serializer)
+        serializer.save()
+
 class CourseViewSet(BaseViewSet):
-    queryset = Course.objects.all()
+    queryset = Course.objects.select_related('department__campus')
     serializer_class = CourseSerializer
+    campus_field = 'department__campus'
     search_fields = ['name', 'code', 'department__name']
     ordering_fields = ['name', 'code', 'department__name']
     ordering = ['name']
@@ -134,34 +297,165 @@ class CourseViewSet(BaseViewSet):
         department_id = self.request.query_params.get('department')
         return queryset.filter(department_id=department_id) if department_id else queryset
 
+    def check_campus(self, serializer):
+        """Officers may only place courses in departments of their own campus"""
+        scope = get_campus_scope(self.request)
+        if scope is None:
+            return
+        department_id = serializer.validated_data.get(
+            'department_id', getattr(serializer.instance, 'department_id', None)
+        )
+        if not Department.objects.filter(pk=department_id, campus_id=scope).exists():
+            raise PermissionDenied({'error': 'You can only manage courses of your own campus.'})
+
+    def perform_create(self, serializer):
+        self.check_campus(serializer)
+        serializer.save()
+
+    def perform_update(self, serializer):
+        self.check_campus(serializer)
+        serializer.save()
+
 class StudentViewSet(BaseViewSet):
-    queryset = Student.objects.all()
+    queryset = Student.objects.select_related('campus', 'department__campus', 'course')
     serializer_class = StudentSerializer
+    campus_field = 'campus'
     search_fields = ['student_number', 'first_name', 'last_name', 'campus__name', 'department__name']
     ordering_fields = ['student_number', 'first_name', 'last_name', 'year_level']
     ordering = ['last_name', 'first_name']
+    throttle_costs = {'list': 2, 'import_roster': 20}
+    # Imports run one lookup and one upsert per batch of rows
+    query_budgets = {'destroy': None, 'import_roster': None}
     
     def get_queryset(self):
         queryset = super().get_queryset()
         filters = {}
         
         # Build filter dictionary dynamically
-        for param in ['campus', 'department', 'year_level']:
+        for param in ['campus', 'department', 'course', 'year_level']:
             value = self.request.query_params.get(param)
             if value:
-                filter_key = f'{param}_id' if param in ['campus', 'department'] else param
+                filter_key = f'{param}_id' if param in ['campus', 'department', 'course'] else param
                 filters[filter_key] = value
         
         return queryset.filter(**filters) if filters else queryset
 
+    def check_campus(self, serializer):
+        """Officers may only place students in departments of their own campus"""
+        scope = get_campus_scope(self.request)
+        if scope is None:
+            return
+        instance = serializer.instance
+        campus_id = serializer.validated_data.get('campus_id', getattr(instance, 'campus_id', None))
+        department_id = serializer.validated_data.get('department_id', getattr(instance, 'department_id', None))
+        if campus_id != scope or not Department.objects.filter(pk=department_id, campus_id=scope).exists():
+            raise PermissionDenied({'error': 'You can only manage students of your own campus.'})
+
+    def perform_create(self, serializer):
+        self.check_campus(serializer)
+        serializer.save()
+
+    def perform_update(self, serializer):
+        self.check_campus(serializer)
+        serializer.save()
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_roster(self, request):
+        """Create or update students from an uploaded CSV/NDJSON roster, resolving campus and department by code"""
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload the roster as the "file" field.'}, status=400)
+        scope = get_campus_scope(request)
+        if scope == NO_CAMPUS:
+            return Response({'error': 'User is not an officer.'}, status=403)
+
+        roster = RosterImport(campus_scope=scope)
+        try:
+            summary = roster.run(read_rows(upload))
+        except RosterError as e:
+            return Response({'error': str(e)}, status=400)
+        if summary['created'] or summary['updated']:
+            # Student campus/department feed the GWA groupings
+            bump_version('gwa')
+        if roster.updated_departments:
+            schedule_refresh(departments=roster.updated_departments)
+        return Response(summary)
+
+class VersionConflict(Exception):
+    """Raised when an edit was made against an outdated record version"""
+
+    def __init__(self, version):
+        super().__init__(version)
+        self.version = version
+
+def gwa_param(request, name):
+    """A GWA query parameter as an exact Decimal, None when absent; 400 when it isn't a GWA"""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        return hundredths_to_decimal(parse_hundredths(value))
+    except ValueError:
+        raise ValidationError({name: f'Enter a GWA from 1.00 to 5.00 with at most two decimals, not {value!r}.'})
+
+def gwa_stats(row):
+    """Convert aggregated GWA hundredths to GWAs; the average is exact integer division rounded half up"""
+    count, total = row['total_records'], row['gwa_total']
+    return {
+        'total_records': count,
+        'average_gwa': (2 * total + count) // (2 * count) / 100 if count else None,
+        'highest_gwa': row['highest_gwa'] / 100 if count else None,
+        'lowest_gwa': row['lowest_gwa'] / 100 if count else None,
+        'honor_eligible': row['honor_eligible'],
+    }
+
+# Relations GWARecordSerializer renders for every record
+GWA_RECORD_RELATIONS = ('student__campus', 'student__department__campus', 'student__course', 'encoded_by')
+
 class GWARecordViewSet(BaseViewSet):
-    queryset = GWARecord.objects.all()
+    queryset = GWARecord.objects.select_related(*GWA_RECORD_RELATIONS)
     serializer_class = GWARecordSerializer
+    campus_field = 'student__campus'
     search_fields = ['student__student_number', 'student__first_name', 'student__last_name', 'semester', 'academic_year']
     ordering_fields = ['academic_year', 'semester', 'gwa', 'created_at']
     ordering = ['-academic_year', '-semester']
+    # Read-only actions that transparently read archived academic years
+    archive_actions = ('list', 'retrieve', 'honor_eligible', 'statistics', 'honor_thresholds')
+    max_thresholds = 50
+    histogram_width = 25  # hundredths of a GWA point
+    distribution_cache_timeout = 300
+    # Breakdowns accepted by ?group_by=: lookup path from a record, and the grouped model
+    group_fields = {
+        'campus': ('student__campus', Campus),
+        'department': ('student__department', Department),
+        'course': ('student__course', Course),
+    }
+    max_bulk_edits = 1000
+    # Aggregates scan a campus worth of records, so they spend from their own bucket
+    throttle_scopes = {
+        'statistics': 'analytics',
+        'honor_eligible': 'analytics',
+        'honor_thresholds': 'analytics',
+        'trends': 'analytics',
+    }
+    throttle_costs = {
+        'list': 2,
+        'bulk_edit': 5,
+        'statistics': 10,
+        'honor_eligible': 5,
+        'honor_thresholds': 10,
+        'trends': 2,
+    }
     
     def get_queryset(self):
+        academic_year = self.request.query_params.get('academic_year')
+        if (
+            self.action in self.archive_actions
+            and academic_year
+            and AcademicYearArchive.is_archived(academic_year)
+        ):
+            self.queryset = ArchivedGWARecord.objects.select_related(*GWA_RECORD_RELATIONS)
+
         queryset = super().get_queryset()
         filters = {}
         
@@ -171,65 +465,344 @@ class GWARecordViewSet(BaseViewSet):
             if value:
                 filter_key = f'{param}_id' if param == 'student' else param
                 filters[filter_key] = value
+        course = self.request.query_params.get('course')
+        if course:
+            filters['student__course_id'] = course
         
-        # GWA range filters
-        min_gwa = self.request.query_params.get('min_gwa')
-        max_gwa = self.request.query_params.get('max_gwa')
+        # GWA range filters; honor_eligible reads min_gwa as its cutoff instead
+        min_gwa = None if self.action == 'honor_eligible' else gwa_param(self.request, 'min_gwa')
+        max_gwa = gwa_param(self.request, 'max_gwa')
         
-        if min_gwa:
+        if min_gwa is not None:
             filters['gwa__gte'] = min_gwa
-        if max_gwa:
+        if max_gwa is not None:
             filters['gwa__lte'] = max_gwa
         
-        return queryset.filter(**filters) if filters else queryset
+        queryset = queryset.filter(**filters) if filters else queryset
+        if self.action in ('update', 'partial_update'):
+            # Lock the record so the version check and the save can't interleave
+            queryset = queryset.select_for_update(of=('self',))
+        return queryset
     
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            if self.action != 'retrieve' or self.queryset.model is ArchivedGWARecord:
+                raise
+            # Archived records keep their ids, so fall back to the archive
+            self.queryset = ArchivedGWARecord.objects.select_related(*GWA_RECORD_RELATIONS)
+            return super().get_object()
+
+    def get_student(self, serializer):
+        """The student of a created or edited record, which must exist and, for officers, be on their campus.
+
+        Loaded with the relations the response renders, so saving with it
+        spares the serializer a lookup per relation.
+        """
+        student_id = serializer.validated_data.get('student_id')
+        if student_id is None:
+            return serializer.instance.student
+        students = Student.objects.select_related('campus', 'department__campus', 'course').filter(pk=student_id)
+        student = scope_queryset(students, self.request, 'campus').first()
+        if student is None:
+            raise ValidationError({'student_id': 'Student not found.'})
+        return student
+
     def perform_create(self, serializer):
-        serializer.save(encoded_by=self.request.user)
+        student = self.get_student(serializer)
+        with transaction.atomic():
+            record = serializer.save(student=student, encoded_by=self.request.user)
+            GWARecordHistory.log([record], GWARecordHistory.CREATE, self.request.user)
+    
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            GWARecordHistory.log([instance], GWARecordHistory.DELETE, self.request.user)
+            instance.delete()
+    
+    def update(self, request, *args, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().update(request, *args, **kwargs)
+        except VersionConflict as conflict:
+            return Response(
+                {'error': 'This record was changed by someone else.', 'version': conflict.version},
+                status=409
+            )
     
     def perform_update(self, serializer):
-        serializer.save(encoded_by=self.request.user)
+        student = self.get_student(serializer)
+        record = serializer.instance
+        expected = self.request.data.get('version')
+        if expected is not None and str(expected) != str(record.version):
+            raise VersionConflict(record.version)
+        record = serializer.save(student=student, encoded_by=self.request.user, version=record.version + 1)
+        GWARecordHistory.log([record], GWARecordHistory.UPDATE, self.request.user)
+    
+    @action(detail=False, methods=['patch'], url_path='bulk')
+    def bulk_edit(self, request):
+        """Apply many {id, gwa, version} edits in one transaction, reporting conflicts per row"""
+        edits = GWAEditSerializer(data=request.data, many=True)
+        edits.is_valid(raise_exception=True)
+        if len(edits.validated_data) > self.max_bulk_edits:
+            return Response({'error': f'At most {self.max_bulk_edits} edits per request.'}, status=400)
+
+        results, changed = [], []
+        now = timezone.now()
+        with transaction.atomic():
+            ids = [edit['id'] for edit in edits.validated_data]
+            records = self.get_queryset().select_for_update(of=('self',)).filter(id__in=ids).in_bulk()
+            for edit in edits.validated_data:
+                record = records.get(edit['id'])
+                if record is None:
+                    results.append({'id': edit['id'], 'status': 'not_found'})
+                elif record.version != edit['version']:
+                    results.append({
+                        'id': record.id, 'status': 'conflict', 'version': record.version, 'gwa': str(record.gwa)
+                    })
+                else:
+                    record.gwa = edit['gwa']
+                    record.version += 1
+                    record.encoded_by = request.user
+                    record.updated_at = now
+                    changed.append(record)
+                    results.append({'id': record.id, 'status': 'updated', 'version': record.version})
+
+            GWARecord.objects.bulk_update(changed, ['gwa', 'version', 'encoded_by', 'updated_at'])
+            GWARecordHistory.log(changed, GWARecordHistory.UPDATE, request.user)
+            if changed:
+                schedule_refresh(
+                    departments=[record.student.department_id for record in changed],
+                    academic_years=[record.academic_year for record in changed],
+                )
+        if changed:
+            # bulk_update sends no model signals
+            bump_version('gwa')
+        return Response({'results': results})
+    
+    @action(detail=False, methods=['put'])
+    @idempotent
+    def upsert(self, request):
+        """Create or update the GWA of a student for a semester in a single INSERT ... ON CONFLICT"""
+        serializer = GWAUpsertSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        students = scope_queryset(Student.objects.filter(pk=data['student_id']), request, 'campus')
+        department_id = students.values_list('department_id', flat=True).first()
+        if department_id is None:
+            return Response({'error': 'Student not found.'}, status=404)
+
+        with transaction.atomic():
+            record, outcome = GWARecord.upsert(user=request.user, **data)
+            if outcome != GWARecord.UNCHANGED:
+                change = GWARecordHistory.CREATE if outcome == GWARecord.CREATED else GWARecordHistory.UPDATE
+                GWARecordHistory.log([record], change, request.user)
+                schedule_refresh(departments=[department_id], academic_years=[record.academic_year])
+        if outcome != GWARecord.UNCHANGED:
+            # The raw upsert sends no model signals
+            bump_version('gwa')
+        return Response(
+            {
+                'id': record.id,
+                'student_id': record.student_id,
+                'semester': record.semester,
+                'academic_year': record.academic_year,
+                'gwa': GWAField().to_representation(record.gwa),
+                'version': record.version,
+                'result': outcome,
+            },
+            status=201 if outcome == GWARecord.CREATED else 200
+        )
+    
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """Paginated change history of one GWA record, newest first"""
+        if not str(pk).isdigit():
+            raise Http404
+        # Read from the log rather than get_object() so deleted records keep their history
+        entries = scope_queryset(
+            GWARecordHistory.objects.filter(record_id=pk), request, 'student__campus'
+        ).select_related('changed_by').order_by('-changed_at', '-id')
+        page = self.paginate_queryset(entries)
+        serializer = GWARecordHistorySerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def honor_eligible(self, request):
-        """Get students eligible for honor society based on GWA"""
-        min_gwa = request.query_params.get('min_gwa', '1.75')
+        """Get students eligible for honor society based on the campus honor policy"""
+        min_gwa = gwa_param(request, 'min_gwa')
         academic_year = request.query_params.get('academic_year')
         
         queryset = self.get_queryset()
         if academic_year:
             queryset = queryset.filter(academic_year=academic_year)
         
-        honor_records = queryset.filter(gwa__lte=min_gwa)
+        honor_records = queryset.filter(HonorPolicy.eligible(queryset, max_gwa=min_gwa))
         serializer = self.get_serializer(honor_records, many=True)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """Get GWA statistics"""
-        from django.db.models import Avg, Count, Max, Min
-        
+        """Get GWA statistics, optionally broken down by campus, department or course"""
+        from django.db.models import Count, Max, Min, Sum
+
+        group_by = request.query_params.get('group_by')
+        if group_by and group_by not in self.group_fields:
+            return Response({'error': f'group_by must be one of: {", ".join(self.group_fields)}.'}, status=400)
+
+        # Records are judged by the policy of their own campus and academic year, as in trends
+        policies = list(HonorPolicy.objects.order_by('pk'))
+        policy_versions = [(policy.pk, policy.version) for policy in policies]
+        filter_params = sorted(request.query_params.items())
+        cache_key = versioned_key('gwa', 'statistics', get_campus_scope(request), policy_versions, filter_params)
+        stats = cache.get(cache_key)
+        if stats is not None:
+            return Response(stats)
+
         queryset = self.get_queryset()
         academic_year = request.query_params.get('academic_year')
         if academic_year:
             queryset = queryset.filter(academic_year=academic_year)
-        
-        stats = queryset.aggregate(
-            total_records=Count('id'),
-            average_gwa=Avg('gwa'),
-            highest_gwa=Min('gwa'),  # Lower GWA is better
-            lowest_gwa=Max('gwa'),
-            honor_eligible=Count('id', filter=models.Q(gwa__lte=1.75))
-        )
-        
+
+        # Aggregated as integer hundredths so no per-row Decimal is involved
+        aggregates = {
+            'total_records': Count('id'),
+            'gwa_total': Sum(GWA_HUNDREDTHS),
+            'highest_gwa': Min(GWA_HUNDREDTHS),  # Lower GWA is better
+            'lowest_gwa': Max(GWA_HUNDREDTHS),
+            'honor_eligible': Count('id', filter=HonorPolicy.eligible(queryset, policies=policies)),
+        }
+        stats = gwa_stats(queryset.aggregate(**aggregates))
+        if group_by:
+            # One grouped query; records of students without a course group under id None
+            path = self.group_fields[group_by][0]
+            rows = (
+                queryset.order_by()
+                .values(f'{path}_id', f'{path}__code', f'{path}__name')
+                .annotate(**aggregates)
+                .order_by(f'{path}__name')
+            )
+            stats['groups'] = [
+                {
+                    'id': row.pop(f'{path}_id'),
+                    'code': row.pop(f'{path}__code'),
+                    'name': row.pop(f'{path}__name'),
+                    **gwa_stats(row),
+                }
+                for row in rows
+            ]
+
+        cache.set(cache_key, stats, self.distribution_cache_timeout)
         return Response(stats)
+    
+    @action(detail=False, methods=['get'])
+    def trends(self, request):
+        """GWA statistics per academic year and semester from the pre-aggregated trend table"""
+        from django.db.models import Max, Min, Sum
+
+        group_by = request.query_params.get('group_by')
+        if group_by and group_by not in ('campus', 'department'):
+            return Response({'error': 'group_by must be one of: campus, department.'}, status=400)
+
+        trends = scope_queryset(GWATrend.objects.all(), request, 'campus')
+        for param in ('campus', 'department'):
+            value = request.query_params.get(param)
+            if value:
+                trends = trends.filter(**{f'{param}_id': value})
+        from_year = request.query_params.get('from_year')
+        to_year = request.query_params.get('to_year')
+        if from_year:
+            trends = trends.filter(academic_year__gte=from_year)
+        if to_year:
+            trends = trends.filter(academic_year__lte=to_year)
+
+        group_fields = [f'{group_by}_id', f'{group_by}__code', f'{group_by}__name'] if group_by else []
+        rows = (
+            trends.values('academic_year', 'semester', *group_fields)
+            .annotate(
+                total_records=Sum('record_count'),
+                gwa_total=Sum('gwa_total'),
+                highest_gwa=Min('best_gwa'),  # Lower GWA is better
+                lowest_gwa=Max('worst_gwa'),
+                honor_eligible=Sum('honor_count'),
+            )
+            .order_by('academic_year', 'semester', *group_fields[2:])
+        )
+        results = []
+        for row in rows:
+            point = {'academic_year': row['academic_year'], 'semester': row['semester']}
+            if group_by:
+                point.update(id=row[group_fields[0]], code=row[group_fields[1]], name=row[group_fields[2]])
+            results.append({**point, **gwa_stats(row)})
+        return Response({'results': results})
+    
+    @action(detail=False, methods=['get'])
+    def honor_thresholds(self, request):
+        """Count honor-eligible records at several candidate GWA cutoffs, plus a GWA histogram"""
+        group_by = request.query_params.get('group_by')
+        if group_by and group_by not in self.group_fields:
+            return Response({'error': f'group_by must be one of: {", ".join(self.group_fields)}.'}, status=400)
+
+        try:
+            thresholds = sorted({
+                parse_hundredths(value)
+                for value in request.query_params.get('thresholds', '1.75').split(',')
+                if value.strip()
+            })
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        if not thresholds or len(thresholds) > self.max_thresholds:
+            return Response({'error': f'Provide between 1 and {self.max_thresholds} thresholds.'}, status=400)
+
+        group_path, group_model = self.group_fields.get(group_by, (None, None))
+        group_field = f'{group_path}_id' if group_path else None
+        # The distribution doesn't depend on the thresholds, so one load serves every cutoff
+        filter_params = sorted((k, v) for k, v in request.query_params.items() if k != 'thresholds')
+        cache_key = versioned_key('gwa', 'distribution', get_campus_scope(request), filter_params)
+        distribution = cache.get(cache_key)
+        if distribution is None:
+            distribution = GWADistribution.from_queryset(self.filter_queryset(self.get_queryset()), group_field)
+            cache.set(cache_key, distribution, self.distribution_cache_timeout)
+
+        labels = [format_hundredths(t) for t in thresholds]
+        data = {
+            'total': len(distribution.overall),
+            'eligible': {label: distribution.count_at_or_below(t) for label, t in zip(labels, thresholds)},
+            'histogram': distribution.histogram(self.histogram_width),
+        }
+        if group_model is not None:
+            names = dict(group_model.objects.filter(id__in=distribution.groups).values_list('id', 'name'))
+            data['groups'] = [
+                {
+                    'id': group,
+                    'name': names.get(group),
+                    'total': len(values),
+                    'eligible': {label: distribution.count_at_or_below(t, group) for label, t in zip(labels, thresholds)},
+                }
+                for group, values in sorted(distribution.groups.items())
+            ]
+        return Response(data)
 
 class HonorSocietyOfficerViewSet(BaseViewSet):
-    queryset = HonorSocietyOfficer.objects.all()
+    queryset = HonorSocietyOfficer.objects.select_related('user', 'campus')
     serializer_class = HonorSocietyOfficerSerializer
+    campus_field = 'campus'
     search_fields = ['user__username', 'user__first_name', 'user__last_name', 'position', 'campus__name']
     ordering_fields = ['position', 'campus__name', 'is_active']
     ordering = ['position']
+    directory_cache_timeout = 300
     
+    def list(self, request, *args, **kwargs):
+        """Officer directory, cached per campus scope and query until an officer, user or campus changes"""
+        key = versioned_key(
+            'officers', 'directory', get_campus_scope(request), request.get_host(), sorted(request.query_params.items())
+        )
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, self.directory_cache_timeout)
+        return Response(data)
+
     def get_queryset(self):
         queryset = super().get_queryset()
         filters = {}
@@ -244,6 +817,7 @@ class HonorSocietyOfficerViewSet(BaseViewSet):
         
         return queryset.filter(**filters) if filters else queryset
 
+@query_budget(max_queries=6, max_db_ms=250)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def register_view(request):
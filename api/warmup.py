@@ -0,0 +1,25 @@
+import logging
+
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+
+from .tokens import blacklist_cache
+
+logger = logging.getLogger(__name__)
+
+
+def warm_caches():
+    """Populate per-process caches so forked workers inherit them.
+
+    Meant to run once in the gunicorn master after the app is preloaded. Database
+    connections are closed afterwards so no socket is shared across forks.
+    """
+    # Builds the URL resolver's reverse and lookup tables
+    get_resolver().reverse_dict
+
+    try:
+        blacklist_cache.warm()
+    except DatabaseError:
+        logger.warning('Skipping token blacklist warm-up; database unavailable', exc_info=True)
+    finally:
+        connections.close_all()
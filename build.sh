@@ -42,9 +42,9 @@ else
 fi
 
 
-# Run tests to ensure everything works
+# Run tests to ensure everything works, spread over all CPUs without coverage
 echo "🧪 Running tests..."
-python -m pytest -v --ds=honor_system.settings
+python -m pytest -q -n auto
 
 if [ $? -eq 0 ]; then
     echo ""
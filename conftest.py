@@ -1,7 +1,11 @@
+import copy
+
 import pytest
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 
+pytest_plugins = ['api.pytest_plugin']
+
 
 @pytest.fixture
 def api_client():
@@ -29,36 +33,46 @@ def admin_user(db):
     )
 
 
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    """Create the campus, department and course once per test database.
+
+    Every test runs in a transaction that is rolled back, so edits and deletes
+    of this reference data never leak into the next test. The fixtures below
+    hand out copies, keeping in-memory changes from leaking too.
+    """
+    from api.models import Campus, Course, Department
+    with django_db_blocker.unblock():
+        campus = Campus.objects.create(name="Test Campus", code="TEST")
+        department = Department.objects.create(
+            name="College of Information and Communications Technology",
+            code="CS",
+            campus=campus
+        )
+        course = Course.objects.create(
+            name="Bachelor of Science in Information Technology",
+            code="BSIT",
+            department=department
+        )
+    return {'campus': campus, 'department': department, 'course': course}
+
+
 @pytest.fixture
-def campus(db):
-    """Create a test campus"""
-    from api.models import Campus
-    return Campus.objects.create(
-        name="Test Campus",
-        code="TEST"
-    )
+def campus(db, django_db_setup):
+    """The test campus"""
+    return copy.deepcopy(django_db_setup['campus'])
 
 
 @pytest.fixture
-def department(db, campus):
-    """Create a test department"""
-    from api.models import Department
-    return Department.objects.create(
-        name="College of Information and Communications Technology",
-        code="CS",
-        campus=campus
-    )
+def department(db, django_db_setup):
+    """The test department"""
+    return copy.deepcopy(django_db_setup['department'])
 
 
 @pytest.fixture
-def course(db, department):
-    """Create a test course"""
-    from api.models import Course
-    return Course.objects.create(
-        name="Bachelor of Science in Information Technology",
-        code="BSIT",
-        department=department
-    )
+def course(db, django_db_setup):
+    """The test course"""
+    return copy.deepcopy(django_db_setup['course'])
 
 
 @pytest.fixture
@@ -112,3 +126,31 @@ def authenticated_client(api_client, user, honor_society_officer):
 def unauthenticated_client(api_client):
     """Provide an unauthenticated API client"""
     return api_client
+
+
+@pytest.fixture(autouse=True)
+def reset_blacklist_cache():
+    """Start every test with an empty in-process token blacklist cache"""
+    from api.tokens import blacklist_cache
+    blacklist_cache.reset()
+    yield
+    blacklist_cache.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_trend_refresh():
+    """Drop trend scopes queued by an earlier test whose transaction was rolled back"""
+    from django.db import connection
+    connection.pending_trend_refresh = None
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Keep cached responses and throttle state from leaking between tests"""
+    from django.core.cache import cache
+    from api.throttling import metrics
+    cache.clear()
+    metrics.reset()
+    yield
+    cache.clear()
+    metrics.reset()
@@ -0,0 +1,46 @@
+"""
+gunicorn configuration for the Honor Society API.
+
+The app is imported once in the master (preload_app) and caches are warmed
+there, so forked workers share that memory copy-on-write and serve their first
+request without cold start work. Workers are recycled after a jittered number
+of requests so they never all restart at once.
+
+Every value can be overridden through the environment.
+"""
+import gc
+import multiprocessing
+import os
+
+
+def _available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return multiprocessing.cpu_count()
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+workers = int(os.environ.get("WEB_CONCURRENCY", _available_cores() * 2 + 1))
+# settings.py reads the same variable to keep LOGIN_CONCURRENCY below it
+threads = int(os.environ.get("GUNICORN_THREADS", "2"))
+worker_class = "gthread" if threads > 1 else "sync"
+
+preload_app = True
+
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+
+def when_ready(server):
+    """Warm caches in the master before any worker is forked"""
+    from api.warmup import warm_caches
+
+    warm_caches()
+    # Objects created so far are never collected, so the collector's
+    # bookkeeping writes don't un-share their pages in the workers
+    gc.freeze()
+    server.log.info("Caches warmed; forking %s %s workers", workers, worker_class)
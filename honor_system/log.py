@@ -0,0 +1,145 @@
+"""
+Non-blocking, structured logging.
+
+Request threads only put records on an in-memory queue (`QueueHandler`); a
+background `QueueListener` thread formats them as JSON and writes them to
+stdout and, optionally, appends them to a file. The queue is bounded so a burst cannot grow memory without
+limit: records that do not fit are dropped and counted, and the count is
+logged once there is room again.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+
+# Id of the request being handled by the current thread, set by RequestLogMiddleware
+request_id_var = contextvars.ContextVar('request_id', default=None)
+
+# LogRecord attributes that are not caller-supplied `extra` fields
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+_listeners = []
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line with the standard fields plus any `extra` passed by the caller"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.process,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the id of the request that logged them"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class SampleFilter(logging.Filter):
+    """Keep a `rate` fraction of records below WARNING; warnings and errors always pass"""
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = float(rate)
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler feeding a listener thread that writes to the given target handlers"""
+
+    def __init__(self, *targets, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.dropped = 0
+        self.listener = QueueListener(self.queue, *targets, respect_handler_level=True)
+        self.listener.start()
+        _listeners.append(self)
+
+    def prepare(self, record):
+        # Unlike the stock prepare, keep the traceback out of the message so
+        # the JSON formatter can put it in a field of its own
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self.dropped:
+                self.queue.put_nowait(self.prepare(logging.makeLogRecord({
+                    'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                    'msg': 'Log queue full, dropped records', 'dropped': self.dropped,
+                })))
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def restart(self):
+        """Start a fresh queue and listener thread, e.g. in a forked worker"""
+        self.queue = queue.Queue(self.queue.maxsize)
+        self.listener = QueueListener(self.queue, *self.listener.handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+
+def queue_handler(filename='', level=logging.INFO, maxsize=10000):
+    """BoundedQueueHandler writing JSON lines to stdout, and appending them to `filename` when set.
+
+    Every gunicorn worker appends to the same file, so it is never rotated
+    in process (each worker would rename it under the others); rotate it
+    externally, e.g. logrotate, and each worker reopens it once it moves.
+    """
+    targets = [logging.StreamHandler(sys.stdout)]
+    if filename:
+        targets.append(WatchedFileHandler(filename, encoding='utf-8'))
+    formatter = JSONFormatter()
+    for target in targets:
+        target.setLevel(level)
+        target.setFormatter(formatter)
+    return BoundedQueueHandler(*targets, maxsize=maxsize)
+
+
+def _restart_listeners():
+    # Threads do not survive fork, so gunicorn workers forked from a preloaded
+    # master would otherwise queue records that nothing ever writes
+    for handler in _listeners:
+        handler.restart()
+
+
+def _stop_listeners():
+    for handler in _listeners:
+        handler.stop()
+
+
+os.register_at_fork(after_in_child=_restart_listeners)
+atexit.register(_stop_listeners)
@@ -56,6 +56,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.RequestLogMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
@@ -65,6 +66,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api.middleware.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "honor_system.urls"
@@ -102,13 +104,55 @@ DATABASES = {
 }
 
 # Fallback to SQLite for development or testing
-if os.environ.get('USE_SQLITE', 'False').lower() == 'true' or TESTING:
+if os.environ.get('USE_SQLITE', 'False').lower() == 'true':
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
         }
     }
+elif TESTING:
+    # Test databases live in memory, one per pytest-xdist worker
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": ":memory:",
+        }
+    }
+
+
+# Cache
+# Shared by every worker process on the host so version-keyed invalidation and
+# throttling see the same state. Set REDIS_URL to share it across hosts.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ['REDIS_URL'],
+        }
+    }
+elif TESTING:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+else:
+    # Throttle counters, idempotency keys (kept a day) and cached statistics
+    # per filter combination outgrow Django's default of 300 entries, past
+    # which a third of the entries, throttle state included, would be dropped
+    # at random. Every write lists the cache directory to count entries, so
+    # the limit also bounds that cost; culling a tenth keeps each cull short
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get('CACHE_DIR', '/tmp/honor_system_cache'),
+            "OPTIONS": {
+                "MAX_ENTRIES": int(os.environ.get('CACHE_MAX_ENTRIES', '10000')),
+                "CULL_FREQUENCY": 10,
+            },
+        }
+    }
 
 
 # Password validation
@@ -129,6 +173,51 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing profiles. The first hasher is used for new hashes; the rest
+# still verify existing hashes, which are upgraded on the next successful login.
+PASSWORD_HASHER_PROFILES = {
+    'argon2': [
+        "django.contrib.auth.hashers.Argon2PasswordHasher",
+        "django.contrib.auth.hashers.ScryptPasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    ],
+    'scrypt': [
+        "django.contrib.auth.hashers.ScryptPasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    ],
+    'pbkdf2': [
+        "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+        "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    ],
+    # Never use outside tests
+    'fast': [
+        "django.contrib.auth.hashers.MD5PasswordHasher",
+    ],
+}
+
+PASSWORD_HASHER_PROFILE = os.environ.get('PASSWORD_HASHER_PROFILE', 'fast' if TESTING else 'argon2')
+if PASSWORD_HASHER_PROFILE == 'argon2':
+    try:
+        import argon2  # noqa: F401
+    except ImportError:
+        PASSWORD_HASHER_PROFILE = 'scrypt'
+
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+
+# Concurrent password checks allowed per process. A login finding every slot
+# taken is told to retry at once instead of waiting, since a waiting login
+# would still hold a worker thread. The bound stays below the worker's thread
+# count (same variable and default as gunicorn.conf.py), so logins alone never
+# occupy every thread; a single-threaded sync worker only ever runs one
+# request, so there it is 1 and never turns a login away
+GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', '2'))
+LOGIN_CONCURRENCY = max(1, min(
+    int(os.environ.get('LOGIN_CONCURRENCY', GUNICORN_THREADS - 1)),
+    GUNICORN_THREADS - 1
+))
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -170,11 +259,13 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
     'DEFAULT_THROTTLE_CLASSES': [
         'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'api.throttling.CostWeightedThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/hour',
-        'user': '1000/hour'
+        'user': '1000/hour',
+        # Token buckets spent by expensive GWA aggregates (see throttle_costs on the ViewSets)
+        'analytics': '200/hour'
     }
 }
 
@@ -184,8 +275,18 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_REFRESH_SERIALIZER': 'api.tokens.CachedTokenRefreshSerializer',
 }
 
+# Seconds between blacklist syncs per process; 0 checks for new entries on every refresh
+TOKEN_BLACKLIST_SYNC_INTERVAL = int(os.environ.get('TOKEN_BLACKLIST_SYNC_INTERVAL', '0'))
+# Seconds a blacklist insert may take to commit. A lower id can commit after a
+# higher one, so ids skipped over are looked up again for this long
+TOKEN_BLACKLIST_SYNC_LAG = int(os.environ.get('TOKEN_BLACKLIST_SYNC_LAG', '60'))
+
+# Seconds a change must age before /api/sync/ hands it out
+SYNC_LAG_SECONDS = int(os.environ.get('SYNC_LAG_SECONDS', '5'))
+
 CORS_ALLOWED_ORIGINS = os.environ.get('CORS_ALLOWED_ORIGINS', 'http://localhost:3000').split(',')
 
 CORS_ALLOWED_CREDENTIALS = True
@@ -203,37 +304,65 @@ if not DEBUG and not TESTING:
     CSRF_COOKIE_SECURE = True
     X_FRAME_OPTIONS = 'DENY'
 
+# Seconds a cached /api/auth/profile/ response may be served; writes invalidate it sooner
+PROFILE_CACHE_TIMEOUT = int(os.environ.get('PROFILE_CACHE_TIMEOUT', '3600'))
+
+# Seconds a response is replayed for retries carrying the same Idempotency-Key
+IDEMPOTENCY_KEY_TIMEOUT = int(os.environ.get('IDEMPOTENCY_KEY_TIMEOUT', '86400'))
+
+# Views over their declared query budget raise instead of logging a warning
+QUERY_BUDGET_STRICT = TESTING
+
+# Request profiling: send `X-Profile: <PROFILING_SECRET>` to profile one request,
+# or sample a fraction of all requests. Profiles are browsable at /api/profiles/ (staff only)
+PROFILING_SECRET = os.environ.get('PROFILING_SECRET', '')
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_DIR = os.environ.get('PROFILING_DIR', '/tmp/honor_system_profiles')
+PROFILING_MAX_FILES = int(os.environ.get('PROFILING_MAX_FILES', '200'))
+PROFILING_TOP_FUNCTIONS = 40
+
 # Logging configuration
+# Request threads only enqueue records; a listener thread writes them as JSON
+# lines to stdout and appends them to LOG_FILE when set (see honor_system/log.py).
+# Workers share the file, so rotate it externally (e.g. logrotate); leave
+# LOG_FILE empty to log to stdout only (the default under tests)
+LOG_FILE = os.environ.get('LOG_FILE', '' if TESTING else 'honor_system.log')
+# Fraction of INFO request logs kept; warnings and errors are always kept
+LOG_REQUEST_SAMPLE_RATE = float(os.environ.get('LOG_REQUEST_SAMPLE_RATE', '1.0'))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
-    'formatters': {
-        'verbose': {
-            'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
-            'style': '{',
+    'filters': {
+        'request_context': {
+            '()': 'honor_system.log.RequestContextFilter',
+        },
+        'request_sample': {
+            '()': 'honor_system.log.SampleFilter',
+            'rate': LOG_REQUEST_SAMPLE_RATE,
         },
     },
     'handlers': {
-        'file': {
-            'level': 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': 'honor_system.log',
-            'formatter': 'verbose',
-        },
-        'console': {
-            'level': 'INFO',
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+        'queue': {
+            '()': 'honor_system.log.queue_handler',
+            'filename': LOG_FILE,
+            'filters': ['request_context'],
         },
     },
     'root': {
-        'handlers': ['console', 'file'],
+        'handlers': ['queue'],
         'level': 'INFO',
     },
     'loggers': {
         'django': {
-            'handlers': ['console', 'file'],
+            'handlers': ['queue'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'api.requests': {
+            'handlers': ['queue'],
             'level': 'INFO',
+            'filters': ['request_sample'],
             'propagate': False,
         },
     },
@@ -0,0 +1,52 @@
+"""
+API-only settings for worker processes.
+
+Drops the admin, sessions, messages and static files apps (and their
+middleware) that a JSON-only worker never touches, which shortens boot time
+and lowers per-worker memory. Enable with
+DJANGO_SETTINGS_MODULE=honor_system.settings_api; keep the full settings for
+any process that serves /admin/.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, TEMPLATES
+
+API_ONLY = True
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in {
+        "django.contrib.admin",
+        "django.contrib.sessions",
+        "django.contrib.messages",
+        "django.contrib.staticfiles",
+    }
+]
+
+# JWT authentication happens in DRF, so session-backed middleware is not needed
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware not in {
+        "whitenoise.middleware.WhiteNoiseMiddleware",
+        "django.contrib.sessions.middleware.SessionMiddleware",
+        "django.middleware.csrf.CsrfViewMiddleware",
+        "django.contrib.auth.middleware.AuthenticationMiddleware",
+        "django.contrib.messages.middleware.MessageMiddleware",
+    }
+]
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+            ],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}